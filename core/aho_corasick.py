@@ -0,0 +1,186 @@
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+Match = Tuple[int, int]
+Transitions = List[Dict[str, int]]
+
+
+class AhoCorasickError(Exception):
+    pass
+
+
+class EmptyPatternError(AhoCorasickError):
+    """
+    Raised when one of the patterns is empty, which would match at every offset.
+    """
+
+    pass
+
+
+class AhoCorasick:
+    """
+    Finds all occurrences of many patterns in a single pass over the text,
+    in O(text + occurrences) once the automaton is built.
+
+    The automaton is the trie of the patterns, where fail[state] generalizes
+    the fail array of MatchKMP: it is the state for the longest proper suffix
+    of the state's string that is also in the trie.
+    output[state] is the nearest state on the fail chain that ends a pattern,
+    or the root if there is none.
+
+    With compact=True, the transitions are stored in flat arrays and looked up
+    by bisection instead of in one dict per state, which takes a fraction of
+    the memory for large dictionaries at some cost in speed.
+    """
+
+    ROOT = 0
+
+    def __init__(self, patterns: Sequence[str], compact: bool = False):
+        self._patterns = list(patterns)
+        self._lengths = [len(pattern) for pattern in self._patterns]
+        if not all(self._lengths):
+            raise EmptyPatternError
+
+        goto, ends = self._build_trie(self._patterns)
+        fail, output = self._build_links(goto, ends)
+        self._compact = compact
+
+        if compact:
+            self._fail = array("l", fail)
+            self._output = array("l", output)
+            self._build_compact(goto, ends)
+        else:
+            self._fail = fail
+            self._output = output
+            self._goto = goto
+            self._ends = ends
+
+    @property
+    def patterns(self) -> List[str]:
+        return self._patterns
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def finditer(self, text: str) -> Iterator[Match]:
+        """
+        Yields (pattern_id, offset) for every occurrence of every pattern,
+        ordered by where the occurrence ends, longest pattern first among
+        those ending at the same character.
+        pattern_id is the index of the pattern in the sequence given.
+        """
+        transition = self._transition
+        patterns_ending_at = self._patterns_ending_at
+        fail = self._fail
+        output = self._output
+        lengths = self._lengths
+        root = self.ROOT
+
+        state = root
+        for index, character in enumerate(text):
+            while True:
+                next_state = transition(state, character)
+                if next_state != -1:
+                    state = next_state
+                    break
+                if state == root:
+                    break
+                state = fail[state]
+
+            match_state = state
+            while match_state != root:
+                for pattern_id in patterns_ending_at(match_state):
+                    yield pattern_id, index - lengths[pattern_id] + 1
+                match_state = output[match_state]
+
+    def findall(self, text: str) -> List[Match]:
+        return list(self.finditer(text))
+
+    def _transition(self, state: int, character: str) -> int:
+        if not self._compact:
+            return self._goto[state].get(character, -1)
+
+        label = ord(character)
+        start = self._edge_start[state]
+        end = self._edge_start[state + 1]
+        position = bisect_left(self._labels, label, start, end)
+        if position < end and self._labels[position] == label:
+            return self._targets[position]
+        return -1
+
+    def _patterns_ending_at(self, state: int) -> Sequence[int]:
+        if not self._compact:
+            return self._ends[state]
+        return self._end_ids[self._end_start[state] : self._end_start[state + 1]]
+
+    @classmethod
+    def _build_trie(
+        cls, patterns: Sequence[str]
+    ) -> Tuple[Transitions, List[List[int]]]:
+        goto: Transitions = [{}]
+        ends: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = cls.ROOT
+            for character in pattern:
+                next_state = goto[state].get(character)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][character] = next_state
+                    goto.append({})
+                    ends.append([])
+                state = next_state
+            ends[state].append(pattern_id)
+        return goto, ends
+
+    @classmethod
+    def _build_links(
+        cls, goto: Transitions, ends: List[List[int]]
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Computes fail and output for every state, in breadth-first order
+        so that the links of shallower states are known when needed.
+        """
+        root = cls.ROOT
+        fail = [root] * len(goto)
+        output = [root] * len(goto)
+
+        # children of the root fail to the root
+        queue = deque(goto[root].values())
+        while queue:
+            state = queue.popleft()
+            for character, child in goto[state].items():
+                queue.append(child)
+
+                fallback = fail[state]
+                while fallback != root and character not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(character, root)
+
+                suffix = fail[child]
+                output[child] = suffix if ends[suffix] else output[suffix]
+
+        return fail, output
+
+    def _build_compact(self, goto: Transitions, ends: List[List[int]]):
+        """
+        Flattens the transitions of state s into
+        labels[edge_start[s]:edge_start[s + 1]], sorted by code point,
+        and the targets alongside them, and the pattern ids likewise.
+        """
+        self._edge_start = array("l", [0])
+        self._labels = array("l")
+        self._targets = array("l")
+        self._end_start = array("l", [0])
+        self._end_ids = array("l")
+
+        for transitions, pattern_ids in zip(goto, ends):
+            for label, target in sorted(
+                (ord(character), target) for character, target in transitions.items()
+            ):
+                self._labels.append(label)
+                self._targets.append(target)
+            self._edge_start.append(len(self._labels))
+            self._end_ids.extend(pattern_ids)
+            self._end_start.append(len(self._end_ids))
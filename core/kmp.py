@@ -1,30 +1,272 @@
-from typing import Tuple, List
+import mmap
+import os
+import threading
 
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-class MatchKMP:
-    def __init__(self, pattern: str):
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_FILE_CHUNK_SIZE = 1 << 24
+
+# str, a bytes-like object or a sequence of hashable tokens
+Text = Union[str, bytes, bytearray, memoryview, mmap.mmap, Sequence[Hashable]]
+Pattern = Union[str, bytes, Tuple[Hashable, ...]]
+BYTES_LIKE = (bytes, bytearray, memoryview, mmap.mmap)
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class KMPError(Exception):
+    pass
+
+
+class EmptyPatternError(KMPError):
+    """
+    Raised when streaming an empty pattern, which would match at every offset.
+    """
+
+    pass
+
+
+class InvalidCacheSizeError(KMPError):
+    """
+    Raised when a cache is given a negative maximum size.
+    """
+
+    pass
+
+
+class MismatchedTypesError(KMPError):
+    """
+    Raised when searching for a str in bytes or for bytes in a str,
+    which can never match.
+    """
+
+    pass
+
+
+def normalize_pattern(pattern: Text) -> Pattern:
+    """
+    Returns an immutable copy of pattern that indexes like the texts
+    it is searched in: str stays str, bytes-like objects become bytes,
+    whose items are ints like those of bytes-like texts,
+    and other sequences of tokens become a tuple.
+    """
+    if isinstance(pattern, str):
+        return pattern
+    if isinstance(pattern, BYTES_LIKE):
+        return bytes(pattern)
+    return tuple(pattern)
+
+
+def normalize_text(pattern: Pattern, text: Text) -> Text:
+    """
+    Returns text ready to be indexed item by item, without copying it.
+    Memoryviews of other formats are cast to unsigned bytes.
+    """
+    if isinstance(pattern, str) and isinstance(text, BYTES_LIKE):
+        raise MismatchedTypesError
+    if isinstance(pattern, bytes) and isinstance(text, str):
+        raise MismatchedTypesError
+    if isinstance(text, memoryview) and (text.format != "B" or text.ndim != 1):
+        return text.cast("B")
+    return text
+
+
+class LRUCache:
+    """
+    A bounded mapping that evicts the least recently used entry,
+    safe to use from multiple threads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self._check_maxsize(maxsize)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        """
+        Returns the entry for key, calling create() to make it on a miss.
+        create runs without holding the lock, so if two threads miss
+        at once both create an entry and the first one stored wins.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        value = create()
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            self._entries[key] = value
+            self._evict()
+        return value
+
+    def resize(self, maxsize: int):
+        self._check_maxsize(maxsize)
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._entries)
+            )
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _check_maxsize(maxsize: int):
+        if maxsize < 0:
+            raise InvalidCacheSizeError(f"maxsize must be non-negative, got {maxsize}")
+
+
+class Matcher(ABC):
+    """
+    The interface shared by the exact matchers, built on finditer.
+    They search a str, bytes-like objects such as bytes, memoryview or mmap.mmap
+    without decoding or copying them, or any sequence of hashable tokens.
+    """
+
+    _pattern: Pattern
+
+    @property
+    def pattern(self) -> Pattern:
+        return self._pattern
+
+    def match(self, text: Text) -> Tuple[bool, int]:
+        index = self.find(text)
+        return index != -1, index
+
+    def find(self, text: Text, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Returns the offset of the first occurrence within text[start:end],
+        or -1, like str.find.
+        """
+        for index in self.finditer(text, start, end):
+            return index
+        return -1
+
+    def count(self, text: Text, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        Returns the number of occurrences within text[start:end],
+        counting overlapping ones, unlike str.count.
+        """
+        return sum(1 for _ in self.finditer(text, start, end))
+
+    @abstractmethod
+    def finditer(
+        self, text: Text, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        """
+        Yields the offsets of all occurrences within text[start:end],
+        including overlapping ones, in increasing order.
+        start and end are interpreted as in slice notation,
+        but text is never sliced.
+        """
+
+
+class MatchKMP(Matcher):
+    """
+    Knuth-Morris-Pratt search, which reads every item of the text once
+    and never moves backwards in it.
+    A matcher never changes after construction, so one can be shared,
+    and compile returns shared matchers for recently used patterns.
+    """
+
+    _cache = LRUCache()
+
+    def __init__(self, pattern: Text):
+        pattern = normalize_pattern(pattern)
+        fail = self._build_fail(pattern)
         self._pattern = pattern
-        self._fail = self._build_fail(pattern)
+        self._fail = tuple(fail)
+        self._border = self._build_border(pattern, fail)
+
+    @classmethod
+    def compile(cls, pattern: Text) -> "MatchKMP":
+        pattern = normalize_pattern(pattern)
+        return cls._cache.get((cls, pattern), lambda: cls(pattern))
+
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
+        return cls._cache.info()
+
+    @classmethod
+    def cache_clear(cls):
+        cls._cache.clear()
 
-    def match(self, text: str) -> Tuple[bool, int]:
+    @classmethod
+    def set_cache_size(cls, maxsize: int):
+        cls._cache.resize(maxsize)
+
+    def finditer(
+        self, text: Text, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        pattern = self._pattern
+        text = normalize_text(pattern, text)
+        start, end, _ = slice(start, end).indices(len(text))
+        pattern_length = len(pattern)
+        if pattern_length == 0:
+            yield from range(start, end + 1)
+            return
+
+        fail = self._fail
+        border = self._border
+        # an occurrence must start at or before last_start
+        last_start = end - pattern_length
         pattern_index = 0
-        text_index = 0
+        text_index = start
 
-        while text_index < len(text) - len(self._pattern) + pattern_index + 1:
-            if pattern_index == len(self._pattern):
-                return True, text_index - len(self._pattern)
-            if self._pattern[pattern_index] == text[text_index]:
+        while text_index - pattern_index <= last_start:
+            if pattern[pattern_index] == text[text_index]:
                 pattern_index += 1
                 text_index += 1
+                if pattern_index == pattern_length:
+                    yield text_index - pattern_length
+                    pattern_index = border
             elif pattern_index != 0:
-                pattern_index = self._fail[pattern_index]
+                pattern_index = fail[pattern_index]
             else:
                 text_index += 1
 
-        return False, -1
-
     @staticmethod
-    def _build_fail(pattern: str) -> List[int]:
+    def _build_fail(pattern: Pattern) -> List[int]:
         """
         Build the fail array for pattern.
         fail[i] stores length of the longest proper prefix of pattern[:i]
@@ -53,3 +295,260 @@ class MatchKMP:
                     prefix_length = fail[prefix_length]
 
         return fail
+
+    @staticmethod
+    def _build_border(pattern: Pattern, fail: List[int]) -> int:
+        """
+        Returns the length of the longest proper prefix of pattern
+        that is also a suffix, where matching continues after an occurrence.
+        """
+        if len(pattern) < 2:
+            return 0
+
+        new_letter = pattern[-1]
+        prefix_length = fail[-1]
+        while True:
+            if pattern[prefix_length] == new_letter:
+                return prefix_length + 1
+            elif prefix_length == 0:
+                return 0
+            else:
+                prefix_length = fail[prefix_length]
+
+
+class MatchDFA(Matcher):
+    """
+    KMP compiled into a deterministic automaton, which takes exactly one
+    table lookup per item of the text instead of following fail links.
+    State j means pattern[:j] was just read, and state len(pattern) a match.
+    columns[item][state] is the next state, for each item of the pattern,
+    other items always lead back to state 0.
+    For bytes patterns the automaton is also stored as a dense table of
+    256 next states per state, which buffers are run through directly.
+    Building it takes O(pattern * distinct items in the pattern).
+    """
+
+    RADIX = 256
+
+    def __init__(self, pattern: Text):
+        pattern = normalize_pattern(pattern)
+        self._pattern = pattern
+        self._columns = self._build_columns(pattern)
+        self._table = None
+        if isinstance(pattern, bytes):
+            self._table = self._build_table(len(pattern), self._columns)
+
+    def finditer(
+        self, text: Text, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        pattern = self._pattern
+        text = normalize_text(pattern, text)
+        start, end, _ = slice(start, end).indices(len(text))
+        pattern_length = len(pattern)
+        if pattern_length == 0:
+            yield from range(start, end + 1)
+            return
+
+        first_offset = start - pattern_length + 1
+        if self._table is not None and isinstance(text, BYTES_LIKE):
+            # states are stored multiplied by RADIX, so that
+            # state + byte indexes the table
+            table = self._table
+            accept = pattern_length * self.RADIX
+            state = 0
+            for offset, byte in enumerate(memoryview(text)[start:end], first_offset):
+                state = table[state + byte]
+                if state == accept:
+                    yield offset
+            return
+
+        get_column = self._columns.get
+        state = 0
+        for index in range(start, end):
+            column = get_column(text[index])
+            state = column[state] if column is not None else 0
+            if state == pattern_length:
+                yield index - pattern_length + 1
+
+    @staticmethod
+    def _build_columns(pattern: Pattern) -> Dict[Hashable, "array[int]"]:
+        """
+        On a mismatch in state j, the automaton continues as it would
+        in state fail[j], or in the border's state after a match,
+        whose transitions are already known since those states come earlier.
+        """
+        pattern_length = len(pattern)
+        if pattern_length == 0:
+            return {}
+
+        fail = MatchKMP._build_fail(pattern)
+        restart = fail + [MatchKMP._build_border(pattern, fail)]
+        columns = {item: array("q", [0]) * (pattern_length + 1) for item in pattern}
+        columns[pattern[0]][0] = 1
+
+        for state in range(1, pattern_length + 1):
+            for column in columns.values():
+                column[state] = column[restart[state]]
+            if state < pattern_length:
+                columns[pattern[state]][state] = state + 1
+
+        return columns
+
+    @classmethod
+    def _build_table(
+        cls, pattern_length: int, columns: Dict[Hashable, "array[int]"]
+    ) -> "array[int]":
+        radix = cls.RADIX
+        table = array("q", [0]) * ((pattern_length + 1) * radix)
+        for byte, column in columns.items():
+            for state, next_state in enumerate(column):
+                table[state * radix + byte] = next_state * radix
+        return table
+
+
+class StreamKMP:
+    """
+    Finds a pattern in text that arrives in chunks, such as a file or socket.
+    Only the position within the pattern is kept between chunks,
+    so memory does not grow with the length of the text.
+    """
+
+    def __init__(self, pattern: Text):
+        pattern = normalize_pattern(pattern)
+        if not pattern:
+            raise EmptyPatternError
+        self._pattern = pattern
+        self._fail = MatchKMP._build_fail(pattern)
+        self._border = MatchKMP._build_border(pattern, self._fail)
+        self.reset()
+
+    def reset(self):
+        self._pattern_index = 0
+        self._offset = 0
+
+    @property
+    def offset(self) -> int:
+        """
+        The number of characters fed so far.
+        """
+        return self._offset
+
+    def feed(self, chunk: Text) -> List[int]:
+        """
+        Consumes the chunk and returns the offsets, counted from the start
+        of the stream, of the occurrences that end within it.
+        """
+        if isinstance(chunk, mmap.mmap):
+            # iterating an mmap yields 1-byte bytes, a memoryview yields ints
+            with memoryview(chunk) as view:
+                return self.feed(view)
+
+        pattern = self._pattern
+        chunk = normalize_text(pattern, chunk)
+        pattern_length = len(pattern)
+        fail = self._fail
+        border = self._border
+        pattern_index = self._pattern_index
+        # offset of the occurrence ending at the current character
+        start = self._offset - pattern_length + 1
+
+        found = []
+        for character in chunk:
+            while pattern_index and pattern[pattern_index] != character:
+                pattern_index = fail[pattern_index]
+            if pattern[pattern_index] == character:
+                pattern_index += 1
+                if pattern_index == pattern_length:
+                    found.append(start)
+                    pattern_index = border
+            start += 1
+
+        self._pattern_index = pattern_index
+        self._offset += len(chunk)
+        return found
+
+    @classmethod
+    def scan(
+        cls,
+        pattern: Text,
+        source: Union[str, os.PathLike, IO[Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        encoding: Optional[str] = None,
+    ) -> Iterator[int]:
+        """
+        Yields the offsets of all occurrences of pattern in a file,
+        given as a path or an open file, reading chunk_size items at a time.
+        A path is opened in binary mode if pattern is bytes-like,
+        and offsets are then byte offsets.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            if isinstance(pattern, BYTES_LIKE):
+                file = open(source, "rb")
+            else:
+                file = open(source, encoding=encoding)
+            with file:
+                yield from cls.scan(pattern, file, chunk_size)
+            return
+
+        matcher = cls(pattern)
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield from matcher.feed(chunk)
+
+
+def iter_search_file(
+    path: Union[str, os.PathLike],
+    pattern: Text,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_FILE_CHUNK_SIZE,
+    engine: Type[Matcher] = MatchKMP,
+) -> Iterator[int]:
+    """
+    Yields the byte offsets of all occurrences of pattern in the file,
+    in increasing order, searching chunks of it in parallel processes.
+    Each process memory-maps the file and searches its chunk plus the
+    len(pattern) - 1 bytes after it, so occurrences that straddle a boundary
+    are found, while each occurrence starts in exactly one chunk and
+    is reported once.
+    engine is the Matcher class used to search each chunk.
+    """
+    pattern = normalize_pattern(pattern)
+    if not pattern:
+        raise EmptyPatternError
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+
+    starts = range(0, size, chunk_size)
+    search = partial(_search_chunk, os.fspath(path), pattern, chunk_size, engine)
+    if workers == 1 or len(starts) == 1:
+        for start in starts:
+            yield from search(start)
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        for offsets in executor.map(search, starts):
+            yield from offsets
+
+
+def search_file(
+    path: Union[str, os.PathLike], pattern: Text, **options: Any
+) -> List[int]:
+    """
+    Returns the sorted byte offsets of all occurrences of pattern in the file.
+    Takes the options of iter_search_file.
+    """
+    return list(iter_search_file(path, pattern, **options))
+
+
+def _search_chunk(
+    path: str, pattern: Pattern, chunk_size: int, engine: Type[Matcher], start: int
+) -> List[int]:
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        end = min(start + chunk_size + len(pattern) - 1, len(mapped))
+        return list(engine(pattern).finditer(mapped, start, end))
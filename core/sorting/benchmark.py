@@ -0,0 +1,185 @@
+"""
+Benchmarks for the sorting package over adversarial input distributions.
+
+Run as
+
+    python -m core.sorting.benchmark --output results.json
+    python -m core.sorting.benchmark --baseline results.json --max-slowdown 1.5
+
+The second form exits with status 1 if any case got slower than
+max_slowdown times its baseline.
+"""
+
+import argparse
+import json
+import random
+import sys
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.timing import Timer
+
+from .mergesort import Mergesort
+from .quickselect import Quickselect
+from .quicksort import Quicksort
+
+Distribution = Callable[[int, random.Random], List[int]]
+Algorithm = Callable[[List[int]], Any]
+Result = Dict[str, Any]
+
+
+def median_of_three_killer(length: int) -> List[int]:
+    """
+    Musser's sequence, which makes quicksort with a median of first,
+    middle and last element pivot take quadratic time.
+    """
+    killer_length = length - length % 4
+    half = killer_length // 2
+    values = [0] * killer_length
+    for i in range(1, half + 1):
+        if i % 2 == 1:
+            values[i - 1] = i
+            values[i] = half + i
+        values[half + i - 1] = 2 * i
+    return values + list(range(killer_length + 1, length + 1))
+
+
+def _sawtooth(length: int, rng: random.Random) -> List[int]:
+    teeth = max(1, int(length**0.5))
+    return [i % teeth for i in range(length)]
+
+
+DISTRIBUTIONS: Dict[str, Distribution] = {
+    "random": lambda length, rng: [rng.randrange(length) for _ in range(length)],
+    "sorted": lambda length, rng: list(range(length)),
+    "reversed": lambda length, rng: list(range(length, 0, -1)),
+    "organ_pipe": lambda length, rng: (
+        list(range(length // 2)) + list(range(length - length // 2, 0, -1))
+    ),
+    "sawtooth": _sawtooth,
+    "few_unique": lambda length, rng: [rng.randrange(8) for _ in range(length)],
+    "all_equal": lambda length, rng: [0] * length,
+    "median_of_three_killer": lambda length, rng: median_of_three_killer(length),
+}
+
+ALGORITHMS: Dict[str, Algorithm] = {
+    "quicksort": Quicksort.run,
+    "mergesort": Mergesort.sort_inplace,
+    "quickselect": lambda array: Quickselect.select(array, len(array) // 2),
+    "builtin": list.sort,
+}
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = SIZES,
+    distributions: Sequence[str] = tuple(DISTRIBUTIONS),
+    algorithms: Sequence[str] = tuple(ALGORITHMS),
+    repeat: int = 3,
+    seed: str = "benchmark",
+) -> List[Result]:
+    """
+    Times every algorithm on every distribution and size,
+    keeping the best of repeat runs on fresh copies of the input.
+    """
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            data = DISTRIBUTIONS[distribution](size, random.Random(seed))
+            for algorithm in algorithms:
+                best = None
+                for _ in range(repeat):
+                    array = list(data)
+                    timer = Timer()
+                    with timer:
+                        ALGORITHMS[algorithm](array)
+                    if best is None or timer.elapsed < best:
+                        best = timer.elapsed
+                results.append(
+                    {
+                        "algorithm": algorithm,
+                        "distribution": distribution,
+                        "size": size,
+                        "seconds": best,
+                    }
+                )
+    return results
+
+
+def find_regressions(
+    results: List[Result],
+    baseline: List[Result],
+    max_slowdown: float,
+    min_seconds: float = 0.001,
+) -> List[str]:
+    """
+    Returns a description of each result slower than max_slowdown times
+    its baseline. Cases under min_seconds in both are too noisy to compare.
+    """
+
+    def case(result: Result):
+        return result["algorithm"], result["distribution"], result["size"]
+
+    baseline_seconds = {case(result): result["seconds"] for result in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline_seconds.get(case(result))
+        if reference is None:
+            continue
+        if max(reference, result["seconds"]) < min_seconds:
+            continue
+        if result["seconds"] > max_slowdown * reference:
+            algorithm, distribution, size = case(result)
+            regressions.append(
+                f"{algorithm} on {distribution} of size {size}: "
+                f"{result['seconds']:.6f}s, baseline {reference:.6f}s"
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS)
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument("--min-seconds", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.sizes, args.distributions, args.algorithms, args.repeat
+    )
+    for result in results:
+        print(
+            f"{result['algorithm']:>12} {result['distribution']:>24} "
+            f"{result['size']:>10} {result['seconds']:.6f}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(
+            results, baseline, args.max_slowdown, args.min_seconds
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import heapq
+import pickle
+import struct
+import sys
+import tempfile
+
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .mergesort import Mergesort
+
+ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
+
+
+class ExternalSortError(Exception):
+    pass
+
+
+class ExternalSort:
+    """
+    Sorts inputs larger than memory.
+    The input is consumed in chunks of about memory_limit bytes,
+    each chunk is sorted with Mergesort and spilled to a temporary file,
+    and the sorted runs are merged lazily, at most fan_in at a time.
+    """
+
+    POINTER_SIZE = struct.calcsize("P")
+    # each element takes a slot in the chunk and one in the merge buffer
+    ELEMENT_OVERHEAD = 2 * POINTER_SIZE
+    # with a key, each element is held in a (key, index, value) triple
+    DECORATION_OVERHEAD = sys.getsizeof((None, None, None)) + sys.getsizeof(2**30)
+
+    @classmethod
+    def run(
+        cls,
+        iterable: Iterable[ValueType],
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        memory_limit: int = 64 * 1024 * 1024,
+        fan_in: int = 16,
+        directory: Optional[str] = None,
+    ) -> Iterator[ValueType]:
+        """
+        Returns an iterator over the elements of iterable in sorted order,
+        stably. Elements are spilled with pickle and must be picklable.
+        memory_limit bounds the working set of sorting a chunk:
+        the shallow size of its elements and keys, as reported by
+        sys.getsizeof, plus the list slots, merge buffer and decoration
+        the sort needs for each of them.
+        """
+        if memory_limit <= 0:
+            raise ExternalSortError("memory_limit must be positive")
+        if fan_in < 2:
+            raise ExternalSortError("fan_in must be at least 2")
+
+        return cls._run(iterable, key, reverse, memory_limit, fan_in, directory)
+
+    @classmethod
+    def _run(
+        cls,
+        iterable: Iterable[ValueType],
+        key: KeyFunction,
+        reverse: bool,
+        memory_limit: int,
+        fan_in: int,
+        directory: Optional[str],
+    ) -> Iterator[ValueType]:
+        runs: List[IO[bytes]] = []
+        try:
+            for chunk, is_last in cls._chunks(iterable, key, reverse, memory_limit):
+                cls._sort_chunk(chunk, key, reverse)
+                values = cls._values(chunk, key)
+                if not runs and is_last:
+                    # everything fit in memory
+                    yield from values
+                    return
+                runs.append(cls._spill(values, directory))
+                # so the next chunk is not built while this one is alive
+                del chunk, values
+
+            while len(runs) > fan_in:
+                merged = []
+                for start in range(0, len(runs), fan_in):
+                    group = runs[start : start + fan_in]
+                    merged.append(
+                        cls._spill(cls._merge(group, key, reverse), directory)
+                    )
+                    for run in group:
+                        run.close()
+                runs = merged
+
+            yield from cls._merge(runs, key, reverse)
+        finally:
+            for run in runs:
+                run.close()
+
+    @classmethod
+    def run_file(
+        cls, source_path: str, target_path: str, encoding: str = "utf-8", **options
+    ):
+        """
+        Sorts the lines of the text file at source_path into target_path.
+        Takes the same keyword options as run.
+        """
+        with open(source_path, encoding=encoding) as source:
+            lines = (line if line.endswith("\n") else line + "\n" for line in source)
+            with open(target_path, "w", encoding=encoding) as target:
+                target.writelines(cls.run(lines, **options))
+
+    @classmethod
+    def _chunks(
+        cls,
+        iterable: Iterable[ValueType],
+        key: KeyFunction,
+        reverse: bool,
+        memory_limit: int,
+    ) -> Iterator[Tuple[List[Any], bool]]:
+        """
+        Yields lists whose sort takes about memory_limit bytes each,
+        together with whether it is the last one.
+        With a key, the lists hold (key, index, value) triples as made by
+        decorate, so that the key is computed once and its size counted.
+        """
+        sign = -1 if reverse else 1
+        chunk: List[Any] = []
+        size = 0
+        for index, value in enumerate(iterable):
+            item_size = sys.getsizeof(value) + cls.ELEMENT_OVERHEAD
+            item = value
+            if key is not None:
+                item_key = key(value)
+                item_size += sys.getsizeof(item_key) + cls.DECORATION_OVERHEAD
+                item = (item_key, sign * index, value)
+
+            if chunk and size + item_size > memory_limit:
+                yield chunk, False
+                chunk = []
+                size = 0
+            chunk.append(item)
+            size += item_size
+
+        yield chunk, True
+
+    @staticmethod
+    def _sort_chunk(chunk: List[Any], key: KeyFunction, reverse: bool):
+        if key is None:
+            Mergesort.sort_inplace(chunk, reverse=reverse)
+            return
+        # the indices are distinct, so values are never compared,
+        # and negated when reverse, which keeps the reversed sort stable
+        Mergesort.sort_inplace(chunk)
+        if reverse:
+            chunk.reverse()
+
+    @staticmethod
+    def _values(chunk: List[Any], key: KeyFunction) -> Iterable[ValueType]:
+        if key is None:
+            return chunk
+        return (value for _, _, value in chunk)
+
+    @staticmethod
+    def _spill(values: Iterable[ValueType], directory: Optional[str]) -> IO[bytes]:
+        run = tempfile.TemporaryFile(dir=directory)
+        pickler = pickle.Pickler(run, pickle.HIGHEST_PROTOCOL)
+        for value in values:
+            pickler.dump(value)
+            # the memo would otherwise keep every value alive
+            pickler.clear_memo()
+        run.seek(0)
+        return run
+
+    @staticmethod
+    def _read(run: IO[bytes]) -> Iterator[ValueType]:
+        unpickler = pickle.Unpickler(run)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+    @classmethod
+    def _merge(
+        cls, runs: List[IO[bytes]], key: KeyFunction, reverse: bool
+    ) -> Iterator[ValueType]:
+        # heapq.merge takes ties from the earliest run, which keeps it stable
+        return heapq.merge(*(cls._read(run) for run in runs), key=key, reverse=reverse)
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+ValueType = Any
+
+
+class _Counted:
+    """
+    Wraps a value and counts every comparison made with it.
+    """
+
+    __slots__ = ["value", "_stats"]
+
+    def __init__(self, value: ValueType, stats: "SortStats"):
+        self.value = value
+        self._stats = stats
+
+    def __lt__(self, other: "_Counted") -> bool:
+        self._stats.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other: "_Counted") -> bool:
+        self._stats.comparisons += 1
+        return self.value > other.value
+
+    def __le__(self, other: "_Counted") -> bool:
+        self._stats.comparisons += 1
+        return self.value <= other.value
+
+    def __ge__(self, other: "_Counted") -> bool:
+        self._stats.comparisons += 1
+        return self.value >= other.value
+
+    def __eq__(self, other: object) -> bool:
+        self._stats.comparisons += 1
+        return isinstance(other, _Counted) and self.value == other.value
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"_Counted({self.value!r})"
+
+
+class _CountingList(list):
+    """
+    Counts every element written, through indices or slices.
+    """
+
+    def __init__(self, values: Sequence[ValueType], stats: "SortStats"):
+        super().__init__(values)
+        self._stats = stats
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._stats.moves += len(value)
+        else:
+            self._stats.moves += 1
+        super().__setitem__(index, value)
+
+
+class SortStats:
+    """
+    Collects what a sort or selection did, when passed as stats=.
+
+    comparisons: element comparisons
+    moves: elements written into the array or its buffers, a swap is two
+    max_depth: deepest level of partitioning, or number of merge passes
+    partitions: number of partitioning steps
+    imbalances: per partition, the largest part as a fraction of the range
+    leaf_sizes: lengths of the ranges handed to a small-sort kernel
+    heapsorts: ranges that fell back to heapsort
+
+    Without stats the algorithms only check for it once per partition
+    or leaf, so they run at full speed.
+    """
+
+    def __init__(self, callback: Optional[Callable[["SortStats"], None]] = None):
+        self.comparisons = 0
+        self.moves = 0
+        self.max_depth = 0
+        self.partitions = 0
+        self.imbalances: List[float] = []
+        self.leaf_sizes: List[int] = []
+        self.heapsorts = 0
+        self._callback = callback
+
+    def record_partition(self, depth: int, length: int, largest: int):
+        self.partitions += 1
+        self.max_depth = max(self.max_depth, depth)
+        if length:
+            self.imbalances.append(largest / length)
+
+    def record_leaf(self, length: int):
+        self.leaf_sizes.append(length)
+
+    def record_depth(self, depth: int):
+        self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "comparisons": self.comparisons,
+            "moves": self.moves,
+            "max_depth": self.max_depth,
+            "partitions": self.partitions,
+            "mean_imbalance": (
+                sum(self.imbalances) / len(self.imbalances) if self.imbalances else 0
+            ),
+            "leaves": len(self.leaf_sizes),
+            "mean_leaf_size": (
+                sum(self.leaf_sizes) / len(self.leaf_sizes) if self.leaf_sizes else 0
+            ),
+            "heapsorts": self.heapsorts,
+        }
+
+    def buffer(self, length: int) -> List[ValueType]:
+        return _CountingList([None] * length, self)
+
+    @staticmethod
+    def unwrap(value: ValueType) -> ValueType:
+        return value.value if isinstance(value, _Counted) else value
+
+    @staticmethod
+    @contextmanager
+    def instrumented(
+        stats: Optional["SortStats"], array: List[ValueType]
+    ) -> Iterator[List[ValueType]]:
+        """
+        Yields the array itself if stats is None.
+        Otherwise yields a counting copy of it,
+        whose values are written back to array on exit.
+        """
+        if stats is None:
+            yield array
+            return
+
+        counted = _CountingList([_Counted(value, stats) for value in array], stats)
+        yield counted
+        for index, item in enumerate(counted):
+            array[index] = item.value
+        if stats._callback is not None:
+            stats._callback(stats)
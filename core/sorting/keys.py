@@ -0,0 +1,41 @@
+from typing import Any, Callable, List, Tuple
+
+from .vectorized import Vectorized
+
+ValueType = Any
+KeyType = Any
+Decorated = Tuple[KeyType, int, ValueType]
+
+
+def decorate(
+    array: List[ValueType], key: Callable[[ValueType], KeyType], reverse: bool = False
+) -> List[Decorated]:
+    """
+    Returns a (key, index, value) triple for each element,
+    calling key exactly once per element.
+    The index breaks ties between equal keys, so values are never compared.
+    It is negated when reverse, so that sorting ascending and then reversing
+    keeps equal keys in their original order.
+    """
+    sign = -1 if reverse else 1
+    return [(key(value), sign * index, value) for index, value in enumerate(array)]
+
+
+def undecorate(decorated: List[Decorated], array: List[ValueType], reverse: bool):
+    """
+    Writes the values of the sorted triples back into array,
+    which may also be an array.array or a NumPy array.
+    """
+    if reverse:
+        decorated.reverse()
+    array[:] = Vectorized.like(array, [value for _, _, value in decorated])
+
+
+def reverse_inplace(array: List[ValueType]):
+    """
+    Reverses a list or array.array, or a NumPy array, which has no reverse().
+    """
+    if hasattr(array, "reverse"):
+        array.reverse()
+    else:
+        array[:] = array[::-1].copy()
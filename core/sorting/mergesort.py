@@ -1,43 +1,445 @@
-from typing import Any, List
+import heapq
+
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+
+from .instrumentation import SortStats
+from .keys import decorate, reverse_inplace, undecorate
+from .smallsort import Kernel, SmallSort
+from .vectorized import Vectorized
 
 ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
+Run = Tuple[int, int]
 
 
 class Mergesort:
+    # runs shorter than this are extended with binary insertion
+    MIN_RUN = 32
+    # consecutive wins after which merging switches to galloping
+    MIN_GALLOP = 7
+    # inputs shorter than this are sorted serially, even if workers are given
+    PARALLEL_THRESHOLD = 100_000
+    # bottom-up merging starts from runs of this length sorted by a kernel
+    SMALL_SORT_CUTOFF = 16
+
     @classmethod
-    def run(cls, array: List[ValueType]) -> List[ValueType]:
-        return cls._sort(array, 0, len(array))
+    def run(
+        cls,
+        array: List[ValueType],
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        adaptive: bool = False,
+        workers: Optional[int] = None,
+        small_sort: str = "insertion",
+        stats: Optional[SortStats] = None,
+    ) -> List[ValueType]:
+        """
+        Returns a sorted copy of the array.
+        With more than one worker, long arrays are sorted in chunks
+        by a process pool and the sorted chunks merged.
+        Numeric NumPy arrays and array.array are sorted by NumPy,
+        neither of which applies when collecting stats.
+        The copy of a NumPy array or array.array is of the same type,
+        also when sorted with a key.
+        """
+        if stats is None and key is None and Vectorized.supports(array):
+            result = Vectorized.copy(array)
+            Vectorized.sort(result, stable=True, reverse=reverse)
+            return result
+
+        parallel = workers is not None and workers > 1
+        if stats is None and parallel and len(array) >= cls.PARALLEL_THRESHOLD:
+            result = cls._run_parallel(
+                array, key, reverse, adaptive, workers, small_sort
+            )
+            return Vectorized.like(array, result)
+
+        result = list(array)
+        cls.sort_inplace(
+            result,
+            key=key,
+            reverse=reverse,
+            adaptive=adaptive,
+            small_sort=small_sort,
+            stats=stats,
+        )
+        return Vectorized.like(array, result)
 
     @classmethod
-    def _sort(cls, array: List[ValueType], start: int, end: int) -> List[ValueType]:
-        if end == start:
-            return []
-        if end == start + 1:
-            return array[start:end]
+    def sort_inplace(
+        cls,
+        array: List[ValueType],
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        adaptive: bool = False,
+        small_sort: str = "insertion",
+        stats: Optional[SortStats] = None,
+    ):
+        """
+        Sorts the array in-place with a bottom-up mergesort.
+        Runs of doubling width are merged back and forth between the array
+        and a single auxiliary buffer of the same length.
+
+        If adaptive, merges natural runs of the input instead,
+        which takes O(n) comparisons on sorted or reverse-sorted input.
+
+        small_sort is the stable SmallSort kernel for the initial runs
+        of the bottom-up mergesort.
 
-        middle = start + (end - start) // 2
+        If stats is given, it collects comparison, move and merge counts.
+
+        The sort is stable, also with key and reverse.
+        """
+        kernel = SmallSort.get(small_sort, stable=True)
+        if stats is None and key is None and Vectorized.supports(array):
+            Vectorized.sort(array, stable=True, reverse=reverse)
+            return
+
+        if adaptive:
+            sort = partial(cls._sort_adaptive, stats=stats)
+        else:
+            sort = partial(cls._sort_bottom_up, small_sort=kernel, stats=stats)
+
+        if key is not None:
+            items = decorate(array, key, reverse)
+        else:
+            items = array
+            if reverse:
+                reverse_inplace(array)
+
+        with SortStats.instrumented(stats, items) as target:
+            sort(target)
+
+        if key is not None:
+            undecorate(items, array, reverse)
+        elif reverse:
+            reverse_inplace(array)
+
+    @classmethod
+    def _run_parallel(
+        cls,
+        array: List[ValueType],
+        key: KeyFunction,
+        reverse: bool,
+        adaptive: bool,
+        workers: int,
+        small_sort: str,
+    ) -> List[ValueType]:
+        # keys are computed here, key functions need not be picklable
+        if key is not None:
+            items = decorate(array, key, reverse)
+        elif reverse:
+            items = array[::-1]
+        else:
+            items = array
 
-        left_part = cls._sort(array, start, middle)
-        right_part = cls._sort(array, middle, end)
+        chunk_length = -(-len(items) // workers)
+        chunks = [
+            items[start : start + chunk_length]
+            for start in range(0, len(items), chunk_length)
+        ]
+        with ProcessPoolExecutor(workers) as executor:
+            sorted_chunks = list(
+                executor.map(
+                    partial(cls.run, adaptive=adaptive, small_sort=small_sort), chunks
+                )
+            )
 
-        return cls._merge(left_part, right_part)
+        # like _merge, ties are taken from the leftmost chunk
+        result = list(heapq.merge(*sorted_chunks))
+
+        if key is not None:
+            undecorate(result, result, reverse)
+        elif reverse:
+            result.reverse()
+        return result
+
+    @classmethod
+    def _sort_bottom_up(
+        cls,
+        array: List[ValueType],
+        small_sort: Kernel,
+        stats: Optional[SortStats] = None,
+    ):
+        length = len(array)
+        if length < 2:
+            return
+
+        width = min(cls.SMALL_SORT_CUTOFF, length)
+        for start in range(0, length, width):
+            if stats is not None:
+                stats.record_leaf(min(width, length - start))
+            small_sort(array, start, min(start + width, length))
+
+        source = array
+        target = [None] * length if stats is None else stats.buffer(length)
+        passes = 0
+        while width < length:
+            for start in range(0, length, 2 * width):
+                middle = min(start + width, length)
+                end = min(start + 2 * width, length)
+                cls._merge(source, target, start, middle, end)
+
+            source, target = target, source
+            width *= 2
+            passes += 1
+
+        if stats is not None:
+            stats.record_depth(passes)
+
+        if source is not array:
+            array[:] = source
 
     @staticmethod
-    def _merge(left: List[ValueType], right: List[ValueType]) -> List[ValueType]:
-        buffer_list = []
-        left_index = 0
-        right_index = 0
-
-        while left_index < len(left) and right_index < len(right):
-            if right[right_index] < left[left_index]:
-                buffer_list.append(right[right_index])
+    def _merge(
+        source: List[ValueType],
+        target: List[ValueType],
+        start: int,
+        middle: int,
+        end: int,
+    ):
+        """
+        Merges the sorted runs source[start:middle] and source[middle:end]
+        into target[start:end].
+        Ties are taken from the left run, which keeps the sort stable.
+        """
+        left_index = start
+        right_index = middle
+        target_index = start
+
+        while left_index < middle and right_index < end:
+            if source[right_index] < source[left_index]:
+                target[target_index] = source[right_index]
                 right_index += 1
-                continue
+            else:
+                target[target_index] = source[left_index]
+                left_index += 1
+            target_index += 1
+
+        if left_index < middle:
+            target[target_index:end] = source[left_index:middle]
+        else:
+            target[target_index:end] = source[right_index:end]
+
+    @classmethod
+    def _sort_adaptive(cls, array: List[ValueType], stats: Optional[SortStats] = None):
+        length = len(array)
+        if length < 2:
+            return
+
+        min_run = cls._min_run_length(length)
+        buffer = [None] * length if stats is None else stats.buffer(length)
+        # stack of (start, length) of sorted runs, left to right
+        runs: List[Run] = []
 
-            buffer_list.append(left[left_index])
-            left_index += 1
+        start = 0
+        while start < length:
+            end = cls._count_run(array, start, length)
+            if end - start < min_run:
+                forced_end = min(start + min_run, length)
+                if stats is not None:
+                    stats.record_leaf(forced_end - start)
+                cls._binary_insertion_sort(array, start, forced_end, end)
+                end = forced_end
 
-        buffer_list.extend(left[i] for i in range(left_index, len(left)))
-        buffer_list.extend(right[i] for i in range(right_index, len(right)))
+            runs.append((start, end - start))
+            if stats is not None:
+                stats.record_depth(len(runs))
+            cls._merge_collapse(array, buffer, runs)
+            start = end
+
+        while len(runs) > 1:
+            cls._merge_at(array, buffer, runs, len(runs) - 2)
+
+    @classmethod
+    def _min_run_length(cls, length: int) -> int:
+        """
+        Returns a run length between MIN_RUN / 2 and MIN_RUN such that
+        length / min_run is close to, but no more than, a power of two.
+        """
+        remainder = 0
+        while length >= cls.MIN_RUN:
+            remainder |= length & 1
+            length >>= 1
+        return length + remainder
+
+    @staticmethod
+    def _count_run(array: List[ValueType], start: int, end: int) -> int:
+        """
+        Returns the end of the run beginning at start.
+        A strictly descending run is reversed in-place,
+        which cannot break stability because it has no equal elements.
+        """
+        run_end = start + 1
+        if run_end == end:
+            return run_end
+
+        if array[run_end] < array[start]:
+            run_end += 1
+            while run_end < end and array[run_end] < array[run_end - 1]:
+                run_end += 1
+            array[start:run_end] = array[start:run_end][::-1]
+        else:
+            run_end += 1
+            while run_end < end and not array[run_end] < array[run_end - 1]:
+                run_end += 1
+
+        return run_end
+
+    @staticmethod
+    def _binary_insertion_sort(
+        array: List[ValueType], start: int, end: int, sorted_end: int
+    ):
+        """
+        Sorts array[start:end], given that array[start:sorted_end] is sorted.
+        """
+        for current in range(sorted_end, end):
+            value = array[current]
+            position = bisect_right(array, value, start, current)
+            array[position + 1 : current + 1] = array[position:current]
+            array[position] = value
+
+    @classmethod
+    def _merge_collapse(
+        cls, array: List[ValueType], buffer: List[ValueType], runs: List[Run]
+    ):
+        """
+        Merges runs on top of the stack until their lengths satisfy
+        runs[-3] > runs[-2] + runs[-1] and runs[-2] > runs[-1],
+        which keeps the stack logarithmic and the merges balanced.
+        """
+        while len(runs) > 1:
+            index = len(runs) - 2
+            lengths = [length for _, length in runs[-4:]]
+            if (len(lengths) > 2 and lengths[-3] <= lengths[-2] + lengths[-1]) or (
+                len(lengths) > 3 and lengths[-4] <= lengths[-3] + lengths[-2]
+            ):
+                if lengths[-3] < lengths[-1]:
+                    index -= 1
+            elif lengths[-2] > lengths[-1]:
+                break
+            cls._merge_at(array, buffer, runs, index)
+
+    @classmethod
+    def _merge_at(
+        cls,
+        array: List[ValueType],
+        buffer: List[ValueType],
+        runs: List[Run],
+        index: int,
+    ):
+        start, left_length = runs[index]
+        middle, right_length = runs[index + 1]
+        end = middle + right_length
+        runs[index] = (start, left_length + right_length)
+        del runs[index + 1]
+
+        # elements of the left run not greater than the right's first
+        # and elements of the right run not less than the left's last
+        # are already in place
+        start = cls._gallop_right(array[middle], array, start, middle)
+        if start == middle:
+            return
+        end = cls._gallop_left(array[middle - 1], array, middle, end)
+
+        cls._merge_galloping(array, buffer, start, middle, end)
+
+    @classmethod
+    def _merge_galloping(
+        cls,
+        array: List[ValueType],
+        buffer: List[ValueType],
+        start: int,
+        middle: int,
+        end: int,
+    ):
+        """
+        Merges the sorted runs array[start:middle] and array[middle:end].
+        The left run is moved to the buffer first.
+        Once either run wins MIN_GALLOP times in a row, whole blocks
+        are located by galloping instead of one comparison per element.
+        """
+        buffer[start:middle] = array[start:middle]
+        left = start
+        right = middle
+        target = start
+
+        while left < middle and right < end:
+            left_wins = 0
+            right_wins = 0
+            while left < middle and right < end:
+                if array[right] < buffer[left]:
+                    array[target] = array[right]
+                    right += 1
+                    right_wins += 1
+                    left_wins = 0
+                else:
+                    array[target] = buffer[left]
+                    left += 1
+                    left_wins += 1
+                    right_wins = 0
+                target += 1
+                if left_wins >= cls.MIN_GALLOP or right_wins >= cls.MIN_GALLOP:
+                    break
+
+            while left < middle and right < end:
+                stop = cls._gallop_right(array[right], buffer, left, middle)
+                left_count = stop - left
+                array[target : target + left_count] = buffer[left:stop]
+                target += left_count
+                left = stop
+                if left == middle:
+                    break
+
+                stop = cls._gallop_left(buffer[left], array, right, end)
+                right_count = stop - right
+                array[target : target + right_count] = array[right:stop]
+                target += right_count
+                right = stop
+
+                if left_count < cls.MIN_GALLOP and right_count < cls.MIN_GALLOP:
+                    break
+
+        # whatever is left of the right run is already in place
+        array[target : target + middle - left] = buffer[left:middle]
+
+    @staticmethod
+    def _gallop_right(
+        value: ValueType, array: List[ValueType], start: int, end: int
+    ) -> int:
+        """
+        Returns the first index in array[start:end] whose element is greater
+        than value, probing at exponentially growing offsets from start.
+        """
+        low = start
+        high = start
+        step = 1
+        while high < end and not value < array[high]:
+            low = high + 1
+            high += step
+            step *= 2
+
+        return bisect_right(array, value, low, min(high, end))
+
+    @staticmethod
+    def _gallop_left(
+        value: ValueType, array: List[ValueType], start: int, end: int
+    ) -> int:
+        """
+        Returns the first index in array[start:end] whose element is not less
+        than value, probing at exponentially growing offsets from start.
+        """
+        low = start
+        high = start
+        step = 1
+        while high < end and array[high] < value:
+            low = high + 1
+            high += step
+            step *= 2
 
-        return buffer_list
+        return bisect_left(array, value, low, min(high, end))
@@ -0,0 +1,89 @@
+from typing import Any, Callable, List, Optional, Sequence
+
+from .mergesort import Mergesort
+from .quicksort import Quicksort
+from .vectorized import Vectorized
+
+ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
+
+
+class PermutationError(Exception):
+    pass
+
+
+class InvalidPermutationError(PermutationError):
+    pass
+
+
+class LengthMismatchError(PermutationError):
+    pass
+
+
+def argsort(
+    array: Sequence[ValueType],
+    key: KeyFunction = None,
+    stable: bool = True,
+    reverse: bool = False,
+) -> List[int]:
+    """
+    Returns the permutation that sorts the array,
+    such that [array[i] for i in argsort(array)] is sorted.
+    Only (key, index) pairs are sorted, the array itself is not touched.
+    If stable, equal elements keep their relative order and Mergesort is used,
+    otherwise Quicksort.
+    """
+    if key is None and Vectorized.supports(array):
+        return Vectorized.argsort(array, stable, reverse)
+
+    keys = array if key is None else [key(value) for value in array]
+    sign = -1 if reverse else 1
+    # keys are fully ordered with <, and the unique index breaks ties
+    # between equal keys, so nothing after it, and never a value, is compared
+    pairs = [(keys[index], sign * index) for index in range(len(keys))]
+
+    if stable:
+        Mergesort.sort_inplace(pairs)
+    else:
+        Quicksort.run(pairs)
+
+    if reverse:
+        pairs.reverse()
+    return [sign * index for _, index in pairs]
+
+
+def apply_permutation(permutation: Sequence[int], *arrays: List[ValueType]):
+    """
+    Reorders each array in-place such that array[i] becomes array[permutation[i]].
+    Follows the cycles of the permutation, so every element is moved once
+    and no copy of the arrays is made.
+    """
+    length = len(permutation)
+    if any(len(array) != length for array in arrays):
+        raise LengthMismatchError
+
+    seen = bytearray(length)
+    for index in permutation:
+        if not 0 <= index < length or seen[index]:
+            raise InvalidPermutationError(index)
+        seen[index] = True
+
+    done = bytearray(length)
+    for start in range(length):
+        if done[start]:
+            continue
+        done[start] = True
+
+        saved = [array[start] for array in arrays]
+        current = start
+        while True:
+            source = permutation[current]
+            if source == start:
+                break
+            for array in arrays:
+                array[current] = array[source]
+            done[source] = True
+            current = source
+
+        for array, value in zip(arrays, saved):
+            array[current] = value
@@ -1,6 +1,15 @@
-from typing import Any, List
+import math
+import random
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .instrumentation import SortStats
+from .keys import decorate, undecorate
+from .vectorized import Vectorized
 
 ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
 
 
 class QuickSelectError(Exception):
@@ -11,39 +20,258 @@ class OutOfBoundsError(QuickSelectError):
     pass
 
 
+class UnknownPivotStrategyError(QuickSelectError):
+    pass
+
+
 class Quickselect:
+    PIVOT_STRATEGIES = (
+        "first",
+        "random",
+        "median_of_three",
+        "floyd_rivest",
+        "median_of_medians",
+    )
+    # ranges shorter than this take the median of three instead of sampling
+    FLOYD_RIVEST_CUTOFF = 600
+
     @classmethod
-    def select(cls, array: List[ValueType], k: int) -> ValueType:
+    def select(
+        cls,
+        array: List[ValueType],
+        k: int,
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        pivot: str = "median_of_three",
+        stats: Optional[SortStats] = None,
+    ) -> ValueType:
         """
         Returns the k-th order statistic.
         Mutates the array in-place.
+        With reverse, k counts from the largest element.
+
+        pivot is one of PIVOT_STRATEGIES:
+        median_of_three is fast on random, sorted and reverse-sorted input,
+        median_of_medians guarantees O(n) in the worst case.
+
+        If stats is given, it collects comparison, move and partitioning
+        counts for this selection.
         """
+        if pivot not in cls.PIVOT_STRATEGIES:
+            raise UnknownPivotStrategyError(pivot)
         if not (0 <= k < len(array)):
             raise OutOfBoundsError
-        return cls._select(array, k, 0, len(array))
+        if reverse:
+            k = len(array) - 1 - k
+
+        if stats is None and key is None and Vectorized.supports(array):
+            return Vectorized.select(array, k)
+
+        # the decorated array is partitioned ascending even when reverse
+        items = array if key is None else decorate(array, key)
+        with SortStats.instrumented(stats, items) as target:
+            value = cls._select(target, k, 0, len(target), pivot, stats)
+            value = SortStats.unwrap(value)
+
+        if key is None:
+            return value
+        undecorate(items, array, False)
+        return value[2]
+
+    @classmethod
+    def select_many(
+        cls,
+        array: List[ValueType],
+        ks: Sequence[int],
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        pivot: str = "median_of_three",
+        stats: Optional[SortStats] = None,
+    ) -> List[ValueType]:
+        """
+        Returns the k-th order statistic for each k in ks.
+        Partitions once for all ranks, only recursing into the segments
+        that still contain a requested rank, which costs O(n log len(ks)).
+        Mutates the array in-place.
+        """
+        if pivot not in cls.PIVOT_STRATEGIES:
+            raise UnknownPivotStrategyError(pivot)
+        if not all(0 <= k < len(array) for k in ks):
+            raise OutOfBoundsError
+        if reverse:
+            ks = [len(array) - 1 - k for k in ks]
+        ranks = sorted(set(ks))
+
+        if stats is None and key is None and Vectorized.supports(array):
+            return Vectorized.select_many(array, ks)
+
+        items = array if key is None else decorate(array, key)
+        with SortStats.instrumented(stats, items) as target:
+            found = cls._select_many(target, ranks, 0, len(target), pivot, stats)
+            found = {k: SortStats.unwrap(value) for k, value in found.items()}
+
+        if key is None:
+            return [found[k] for k in ks]
+        undecorate(items, array, False)
+        return [found[k][2] for k in ks]
+
+    @classmethod
+    def quantiles(
+        cls, array: List[ValueType], qs: Sequence[float], **options
+    ) -> List[ValueType]:
+        """
+        Returns the nearest-rank q-quantile for each q in qs,
+        e.g. 0.5 for the median and 0.99 for the 99th percentile.
+        Takes the same keyword options as select_many.
+        """
+        if not array or not all(0 <= q <= 1 for q in qs):
+            raise OutOfBoundsError
+        ks = [max(0, math.ceil(q * len(array)) - 1) for q in qs]
+        return cls.select_many(array, ks, **options)
+
+    @classmethod
+    def _select_many(
+        cls,
+        array: List[ValueType],
+        ks: List[int],
+        start: int,
+        end: int,
+        strategy: str,
+        stats: Optional[SortStats] = None,
+    ) -> Dict[int, ValueType]:
+        """
+        Returns the order statistics for the sorted, distinct ranks ks.
+        """
+        found = {}
+        # segments array[start:end] containing the ranks ks[low:high],
+        # reached after depth partitions
+        stack = [(start, end, 0, len(ks), 0)] if ks else []
+
+        while stack:
+            start, end, low, high, depth = stack.pop()
+            if high - low == 1:
+                found[ks[low]] = cls._select(
+                    array, ks[low], start, end, strategy, stats, depth
+                )
+                continue
+
+            k = ks[(low + high) // 2]
+            pivot = cls._choose_pivot(array, start, end, k, strategy)
+            left, middle, right = cls._partition(array, start, end, pivot)
+            depth += 1
+            if stats is not None:
+                largest = max(left - start, end - middle)
+                stats.record_partition(depth, end - start, largest)
+
+            split_left = bisect_left(ks, left, low, high)
+            split_middle = bisect_left(ks, middle, low, high)
+            for index in range(split_left, split_middle):
+                found[ks[index]] = pivot
+
+            if low < split_left:
+                stack.append((start, left, low, split_left, depth))
+            if split_middle < high:
+                stack.append((middle, end, split_middle, high, depth))
+
+        return found
+
+    @classmethod
+    def _select(
+        cls,
+        array: List[ValueType],
+        k: int,
+        start: int,
+        end: int,
+        strategy: str,
+        stats: Optional[SortStats] = None,
+        depth: int = 0,
+    ) -> ValueType:
+        while True:
+            pivot = cls._choose_pivot(array, start, end, k, strategy)
+            left, middle, right = cls._partition(array, start, end, pivot)
+            if stats is not None:
+                depth += 1
+                largest = max(left - start, end - middle)
+                stats.record_partition(depth, end - start, largest)
+
+            # array[start:left] is less than pivot
+            # it contains left - start elements
+            # array[left:middle] is equal to pivot
+            # it contains middle - left elements
+            # array[middle:end] is more than pivot
+            # it contains end - middle elements
+            if k < left:
+                end = left
+            elif k < middle:
+                return pivot
+            else:
+                start = middle
 
     @classmethod
-    def _select(cls, array: List[ValueType], k: int, start: int, end: int) -> ValueType:
-        pivot = cls._choose_pivot(array, start, end)
-        left, middle, right = cls._partition(array, start, end, pivot)
-
-        # array[start:left] is less than pivot
-        # it contains left - start elements
-        # array[left:middle] is equal to pivot
-        # it contains middle - left elements
-        # array[middle:end] is more than pivot
-        # it contains end - middle elements
-        if k < left:
-            return cls._select(array, k, start, left)
-        elif k < middle:
-            return pivot
-
-        return cls._select(array, k, middle, end)
+    def _choose_pivot(
+        cls, array: List[ValueType], start: int, end: int, k: int, strategy: str
+    ) -> ValueType:
+        return getattr(cls, "_pivot_" + strategy)(array, start, end, k)
 
     @staticmethod
-    def _choose_pivot(array, start, end):
+    def _pivot_first(array: List[ValueType], start: int, end: int, k: int):
         return array[start]
 
+    @staticmethod
+    def _pivot_random(array: List[ValueType], start: int, end: int, k: int):
+        return array[random.randrange(start, end)]
+
+    @staticmethod
+    def _pivot_median_of_three(array: List[ValueType], start: int, end: int, k: int):
+        a = array[start]
+        b = array[start + (end - start) // 2]
+        c = array[end - 1]
+        if b < a:
+            a, b = b, a
+        if c < b:
+            b = c
+            if b < a:
+                b = a
+        return b
+
+    @classmethod
+    def _pivot_floyd_rivest(
+        cls, array: List[ValueType], start: int, end: int, k: int
+    ) -> ValueType:
+        """
+        Selects the element of a random sample of size n^(2/3)
+        whose rank in the sample matches the rank of k in the range,
+        which lands very close to the k-th element.
+        """
+        length = end - start
+        if length < cls.FLOYD_RIVEST_CUTOFF:
+            return cls._pivot_median_of_three(array, start, end, k)
+
+        sample_length = int(length ** (2 / 3))
+        sample = [array[i] for i in random.sample(range(start, end), sample_length)]
+        sample_k = (k - start) * sample_length // length
+        return cls._select(sample, sample_k, 0, sample_length, "floyd_rivest")
+
+    @classmethod
+    def _pivot_median_of_medians(
+        cls, array: List[ValueType], start: int, end: int, k: int
+    ) -> ValueType:
+        """
+        Returns the median of the medians of groups of five,
+        which is larger and smaller than at least 30% of the range.
+        """
+        medians = []
+        for group_start in range(start, end, 5):
+            group = sorted(array[group_start : min(group_start + 5, end)])
+            medians.append(group[(len(group) - 1) // 2])
+
+        if len(medians) == 1:
+            return medians[0]
+        middle = (len(medians) - 1) // 2
+        return cls._select(medians, middle, 0, len(medians), "median_of_medians")
+
     @staticmethod
     def _partition(array, start, end, pivot):
         left = start
@@ -1,19 +1,167 @@
 import random
 
-from typing import Any, List
+from typing import Any, Callable, List, Optional, Tuple
+
+from .instrumentation import SortStats
+from .keys import decorate, reverse_inplace, undecorate
+from .smallsort import Kernel, SmallSort
+from .vectorized import Vectorized
+
+KeyFunction = Optional[Callable[[Any], Any]]
+Range = Tuple[int, int]
+
+
+class QuicksortError(Exception):
+    pass
+
+
+class UnknownStrategyError(QuicksortError):
+    pass
 
 
 class Quicksort:
+    STRATEGIES = ("three_way", "dual_pivot", "block")
+    # block partitioning compares this many elements before swapping any
+    BLOCK_SIZE = 128
+    # ranges shorter than this are sorted by a SmallSort kernel
+    SMALL_SORT_CUTOFF = 16
+
     @classmethod
-    def run(cls, array: List[Any]):
-        cls._sort(array, 0, len(array))
+    def run(
+        cls,
+        array: List[Any],
+        *,
+        key: KeyFunction = None,
+        reverse: bool = False,
+        strategy: str = "three_way",
+        small_sort: str = "insertion",
+        stats: Optional[SortStats] = None,
+    ):
+        """
+        Sorts the array in-place.
+
+        strategy chooses the partitioning scheme:
+        three_way splits into less, equal and greater than one pivot,
+        which is best for inputs with many duplicates,
+        dual_pivot splits around two pivots into three parts,
+        which takes fewer comparisons and swaps on distinct elements,
+        block compares a block of elements before swapping any of them,
+        which takes one comparison per element and only moves the smaller ones.
+
+        small_sort chooses the SmallSort kernel for short ranges,
+        binary_insertion or network take fewer comparisons than insertion,
+        which pays off when comparisons are expensive.
+
+        If stats is given, it collects comparison, move and partitioning
+        counts for this run.
+        """
+        if strategy not in cls.STRATEGIES:
+            raise UnknownStrategyError(strategy)
+        kernel = SmallSort.get(small_sort)
+
+        if key is not None:
+            decorated = decorate(array, key, reverse)
+            with SortStats.instrumented(stats, decorated) as target:
+                cls._sort(target, 0, len(target), strategy, kernel, stats)
+            undecorate(decorated, array, reverse)
+            return
+
+        if stats is None and Vectorized.supports(array):
+            Vectorized.sort(array, reverse=reverse)
+            return
+
+        with SortStats.instrumented(stats, array) as target:
+            cls._sort(target, 0, len(target), strategy, kernel, stats)
+        if reverse:
+            reverse_inplace(array)
 
     @classmethod
-    def _sort(cls, array: List[Any], start: int, end: int):
-        if end - start < 10:
-            cls._insertion_sort(array, start, end)
+    def partial_sort(cls, array: List[Any], k: int, *, key: KeyFunction = None):
+        """
+        Moves the k smallest elements, in sorted order, to array[:k].
+        The order of array[k:] is unspecified.
+        """
+        k = max(0, min(k, len(array)))
+
+        if key is not None:
+            decorated = decorate(array, key)
+            cls._partial_sort(decorated, k)
+            undecorate(decorated, array, False)
+            return
+
+        if Vectorized.supports(array):
+            Vectorized.partial_sort(array, k)
             return
 
+        cls._partial_sort(array, k)
+
+    @classmethod
+    def _partial_sort(cls, array: List[Any], k: int):
+        start = 0
+        end = len(array)
+
+        # array[end:] is never needed, array[:start] is sorted
+        while end - start >= cls.SMALL_SORT_CUTOFF:
+            left, right = cls._partition(array, start, end)
+            if k <= left:
+                end = left
+            elif k <= right:
+                cls._sort(array, start, left)
+                return
+            else:
+                cls._sort(array, start, left)
+                start = right
+
+        cls._insertion_sort(array, start, end)
+
+    @classmethod
+    def _sort(
+        cls,
+        array: List[Any],
+        start: int,
+        end: int,
+        strategy: str = "three_way",
+        small_sort: Kernel = SmallSort.insertion,
+        stats: Optional[SortStats] = None,
+    ):
+        """
+        Introsort.
+        Partitions with an explicit stack instead of recursion, always deferring
+        the larger partitions so that the stack stays logarithmic.
+        Ranges still unsorted after 2 * log2(n) levels of partitioning
+        are heapsorted, which guarantees O(n log n) on adversarial input.
+        """
+        partition = getattr(cls, "_partition_" + strategy)
+        max_depth = 2 * ((end - start).bit_length() - 1)
+        stack = [(start, end, max_depth)]
+
+        while stack:
+            start, end, depth = stack.pop()
+
+            while end - start >= cls.SMALL_SORT_CUTOFF:
+                if depth == 0:
+                    if stats is not None:
+                        stats.heapsorts += 1
+                    cls._heapsort(array, start, end)
+                    break
+                depth -= 1
+
+                # continue with the smallest range, defer the others
+                ranges = partition(array, start, end)
+                ranges.sort(key=lambda r: r[0] - r[1])
+                if stats is not None:
+                    largest = ranges[0][1] - ranges[0][0]
+                    stats.record_partition(max_depth - depth, end - start, largest)
+                start, end = ranges.pop()
+                for range_start, range_end in ranges:
+                    stack.append((range_start, range_end, depth))
+            else:
+                if stats is not None:
+                    stats.record_leaf(end - start)
+                small_sort(array, start, end)
+
+    @classmethod
+    def _partition(cls, array: List[Any], start: int, end: int) -> Tuple[int, int]:
         pivot = cls._choose_pivot(array, start, end)
 
         # array[start:left] before pivot
@@ -34,30 +182,136 @@ class Quicksort:
             else:
                 mid += 1
 
-        if left - start < end - right:
-            cls._sort(array, start, left)
-            cls._sort(array, right, end)
-        else:
-            cls._sort(array, right, end)
-            cls._sort(array, start, left)
+        return left, right
+
+    @classmethod
+    def _partition_three_way(
+        cls, array: List[Any], start: int, end: int
+    ) -> List[Range]:
+        left, right = cls._partition(array, start, end)
+        return [(start, left), (right, end)]
+
+    @classmethod
+    def _partition_dual_pivot(
+        cls, array: List[Any], start: int, end: int
+    ) -> List[Range]:
+        """
+        Yaroslavskiy's partitioning around pivots p <= q into
+        array[start:less] less than p, array[less + 1:greater] between p and q
+        and array[greater + 1:end] greater than q.
+        """
+        first = random.randint(start, end - 1)
+        second = random.randint(start, end - 1)
+        array[start], array[first] = array[first], array[start]
+        array[end - 1], array[second] = array[second], array[end - 1]
+        if array[end - 1] < array[start]:
+            array[start], array[end - 1] = array[end - 1], array[start]
+        low_pivot = array[start]
+        high_pivot = array[end - 1]
+
+        # array[start + 1:less] less than low_pivot
+        # array[less:current] between the pivots
+        # array[greater + 1:end - 1] greater than high_pivot
+        less = start + 1
+        greater = end - 2
+        current = less
+        while current <= greater:
+            value = array[current]
+            if value < low_pivot:
+                array[current], array[less] = array[less], value
+                less += 1
+            elif not value < high_pivot:
+                while current < greater and high_pivot < array[greater]:
+                    greater -= 1
+                array[current], array[greater] = array[greater], value
+                greater -= 1
+                value = array[current]
+                if value < low_pivot:
+                    array[current], array[less] = array[less], value
+                    less += 1
+            current += 1
+
+        less -= 1
+        greater += 1
+        array[start], array[less] = array[less], low_pivot
+        array[end - 1], array[greater] = array[greater], high_pivot
+
+        if not low_pivot < high_pivot:
+            # everything between equal pivots is equal to them
+            return [(start, less), (greater + 1, end)]
+        return [(start, less), (less + 1, greater), (greater + 1, end)]
+
+    @classmethod
+    def _partition_block(cls, array: List[Any], start: int, end: int) -> List[Range]:
+        """
+        Lomuto partitioning around a pivot moved to end - 1.
+        Comparisons for a whole block are done first and their results
+        buffered as offsets, then only the elements less than the pivot
+        are swapped to the front, without a branch per element.
+        """
+        pivot_index = cls._choose_pivot_index(array, start, end)
+        pivot = array[pivot_index]
+        last = end - 1
+        array[pivot_index], array[last] = array[last], pivot
+
+        # array[start:left] less than pivot, array[left:block_start] not less
+        left = start
+        for block_start in range(start, last, cls.BLOCK_SIZE):
+            block_end = min(block_start + cls.BLOCK_SIZE, last)
+            offsets = [i for i in range(block_start, block_end) if array[i] < pivot]
+            for offset in offsets:
+                array[left], array[offset] = array[offset], array[left]
+                left += 1
+
+        array[left], array[last] = pivot, array[left]
+        return [(start, left), (left + 1, end)]
+
+    @staticmethod
+    def _heapsort(array: List[Any], start: int, end: int):
+        """
+        Sorts array[start:end] in-place with a max-heap rooted at start.
+        """
+
+        def sift_down(root: int, heap_end: int):
+            while True:
+                child = 2 * root - start + 1
+                if child >= heap_end:
+                    return
+                if child + 1 < heap_end and array[child] < array[child + 1]:
+                    child += 1
+                if not array[root] < array[child]:
+                    return
+                array[root], array[child] = array[child], array[root]
+                root = child
+
+        for root in range(start + (end - start) // 2 - 1, start - 1, -1):
+            sift_down(root, end)
+
+        for heap_end in range(end - 1, start, -1):
+            array[start], array[heap_end] = array[heap_end], array[start]
+            sift_down(start, heap_end)
 
     @staticmethod
     def _insertion_sort(array: List[Any], start: int, end: int):
-        for current in range(start, end):
-            runner = current
-            while start < runner:
-                swap = runner - 1
-                if array[runner] < array[swap]:
-                    array[runner], array[swap] = array[swap], array[runner]
-                    runner = swap
-                else:
-                    break
+        SmallSort.insertion(array, start, end)
 
-    @classmethod
-    def _choose_pivot(cls, array, start, end):
+    @staticmethod
+    def _choose_pivot_index(array: List[Any], start: int, end: int) -> int:
+        """
+        Returns the index of the median of three random elements,
+        taking two or three comparisons.
+        """
         a = random.randint(start, end - 1)
         b = random.randint(start, end - 1)
         c = random.randint(start, end - 1)
-        candidates = [array[a], array[b], array[c]]
-        cls._insertion_sort(candidates, 0, 3)
-        return candidates[1]
+        if array[b] < array[a]:
+            a, b = b, a
+        if array[c] < array[b]:
+            b = c
+            if array[b] < array[a]:
+                b = a
+        return b
+
+    @classmethod
+    def _choose_pivot(cls, array, start, end):
+        return array[cls._choose_pivot_index(array, start, end)]
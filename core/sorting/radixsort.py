@@ -0,0 +1,116 @@
+from typing import Any, Callable, List, Optional
+
+from .keys import Decorated, decorate, undecorate
+from .quicksort import Quicksort
+
+ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
+
+
+class RadixSortError(Exception):
+    pass
+
+
+class UnsupportedKeyError(RadixSortError):
+    """
+    Raised when the keys are not all integers or not all bytes or str.
+    """
+
+    pass
+
+
+class RadixSort:
+    """
+    Linear-time sorting for integer and byte string keys.
+    Integers are sorted least significant byte first,
+    bytes and str (by their UTF-8 encoding, which preserves code point order)
+    most significant byte first.
+    The sort is stable and in-place.
+    """
+
+    RADIX = 256
+    # MSD buckets smaller than this are insertion sorted
+    BUCKET_CUTOFF = 16
+
+    @classmethod
+    def run(
+        cls, array: List[ValueType], *, key: KeyFunction = None, reverse: bool = False
+    ):
+        if len(array) < 2:
+            return
+
+        # stable descending order: sort the reversed input, then reverse back,
+        # without touching the array until the keys are known to be supported
+        items = array[::-1] if reverse else array
+        decorated = decorate(items, key if key is not None else cls._identity)
+        keys = [item[0] for item in decorated]
+
+        if all(isinstance(k, int) for k in keys):
+            decorated = cls._sort_lsd(decorated, min(keys), max(keys))
+        elif all(isinstance(k, (bytes, bytearray)) for k in keys):
+            cls._sort_msd(decorated)
+        elif all(isinstance(k, str) for k in keys):
+            decorated = [(k.encode(), index, value) for k, index, value in decorated]
+            cls._sort_msd(decorated)
+        else:
+            raise UnsupportedKeyError
+
+        undecorate(decorated, array, reverse)
+
+    @staticmethod
+    def _identity(value: ValueType) -> ValueType:
+        return value
+
+    @classmethod
+    def _sort_lsd(
+        cls, items: List[Decorated], minimum: int, maximum: int
+    ) -> List[Decorated]:
+        """
+        Returns the items sorted by their integer keys.
+        Keys are offset by the minimum, so signed keys need no special casing.
+        """
+        radix = cls.RADIX
+        mask = radix - 1
+        digit_bits = mask.bit_length()
+
+        shift = 0
+        while (maximum - minimum) >> shift:
+            buckets: List[List[Decorated]] = [[] for _ in range(radix)]
+            for item in items:
+                buckets[((item[0] - minimum) >> shift) & mask].append(item)
+            items = [item for bucket in buckets for item in bucket]
+            shift += digit_bits
+
+        return items
+
+    @classmethod
+    def _sort_msd(cls, items: List[Decorated]):
+        """
+        Sorts the items by their byte string keys in-place.
+        Keys in one segment share their first depth bytes.
+        """
+        radix = cls.RADIX
+        stack = [(0, len(items), 0)]
+
+        while stack:
+            start, end, depth = stack.pop()
+            if end - start < cls.BUCKET_CUTOFF:
+                # ties on the key are broken by the index, which keeps it stable
+                Quicksort._insertion_sort(items, start, end)
+                continue
+
+            # bucket 0 holds keys of length depth, which come first
+            buckets: List[List[Decorated]] = [[] for _ in range(radix + 1)]
+            for item in items[start:end]:
+                item_key = item[0]
+                digit = item_key[depth] + 1 if depth < len(item_key) else 0
+                buckets[digit].append(item)
+
+            items[start:end] = [item for bucket in buckets for item in bucket]
+
+            bucket_start = start + len(buckets[0])
+            for bucket in buckets[1:]:
+                bucket_end = bucket_start + len(bucket)
+                if len(bucket) > 1:
+                    stack.append((bucket_start, bucket_end, depth + 1))
+                bucket_start = bucket_end
@@ -0,0 +1,215 @@
+from bisect import bisect_right
+from typing import Any, Callable, Dict, List, Tuple
+
+ValueType = Any
+Comparator = Tuple[int, int]
+Kernel = Callable[[List[ValueType], int, int], None]
+
+
+class SmallSortError(Exception):
+    pass
+
+
+class UnknownKernelError(SmallSortError):
+    pass
+
+
+class UnstableKernelError(SmallSortError):
+    """
+    Raised when a stable sort is asked to use a kernel that is not stable.
+    """
+
+    pass
+
+
+def _odd_even_merge_network(length: int) -> List[Comparator]:
+    """
+    Batcher's odd-even mergesort network for the next power of two,
+    without the comparators that touch indices from length onwards.
+    """
+    size = 1
+    while size < length:
+        size *= 2
+
+    comparators = []
+
+    def merge(low: int, high: int, distance: int):
+        step = distance * 2
+        if step < high - low:
+            merge(low, high, step)
+            merge(low + distance, high, step)
+            for i in range(low + distance, high - distance, step):
+                comparators.append((i, i + distance))
+        else:
+            comparators.append((low, low + distance))
+
+    def sort(low: int, high: int):
+        if high - low >= 1:
+            middle = low + (high - low) // 2
+            sort(low, middle)
+            sort(middle + 1, high)
+            merge(low, high, 1)
+
+    sort(0, size - 1)
+    return [(i, j) for i, j in comparators if j < length]
+
+
+# the smallest networks known for 9 to 16 inputs, one layer of
+# independent comparators per line; 9 to 12 are proven optimal
+_KNOWN_NETWORKS: Dict[int, List[List[Comparator]]] = {
+    9: [
+        [(0, 3), (1, 7), (2, 5), (4, 8)],
+        [(0, 7), (2, 4), (3, 8), (5, 6)],
+        [(0, 2), (1, 3), (4, 5), (7, 8)],
+        [(1, 4), (3, 6), (5, 7)],
+        [(0, 1), (2, 4), (3, 5), (6, 8)],
+        [(2, 3), (4, 5), (6, 7)],
+        [(1, 2), (3, 4), (5, 6)],
+    ],
+    10: [
+        [(0, 8), (1, 9), (2, 7), (3, 5), (4, 6)],
+        [(0, 2), (1, 4), (5, 8), (7, 9)],
+        [(0, 3), (2, 4), (5, 7), (6, 9)],
+        [(0, 1), (3, 6), (8, 9)],
+        [(1, 5), (2, 3), (4, 8), (6, 7)],
+        [(1, 2), (3, 5), (4, 6), (7, 8)],
+        [(2, 3), (4, 5), (6, 7)],
+        [(3, 4), (5, 6)],
+    ],
+    11: [
+        [(0, 9), (1, 6), (2, 4), (3, 7), (5, 8)],
+        [(0, 1), (3, 5), (4, 10), (6, 9), (7, 8)],
+        [(1, 3), (2, 5), (4, 7), (8, 10)],
+        [(0, 4), (1, 2), (3, 7), (5, 9), (6, 8)],
+        [(0, 1), (2, 6), (4, 5), (7, 8), (9, 10)],
+        [(2, 4), (3, 6), (5, 7), (8, 9)],
+        [(1, 2), (3, 4), (5, 6), (7, 8)],
+        [(2, 3), (4, 5), (6, 7)],
+    ],
+    12: [
+        [(0, 8), (1, 7), (2, 6), (3, 11), (4, 10), (5, 9)],
+        [(0, 1), (2, 5), (3, 4), (6, 9), (7, 8), (10, 11)],
+        [(0, 2), (1, 6), (5, 10), (9, 11)],
+        [(0, 3), (1, 2), (4, 6), (5, 7), (8, 11), (9, 10)],
+        [(1, 4), (3, 5), (6, 8), (7, 10)],
+        [(1, 3), (2, 5), (6, 9), (8, 10)],
+        [(2, 3), (4, 5), (6, 7), (8, 9)],
+        [(4, 6), (5, 7)],
+        [(3, 4), (5, 6), (7, 8)],
+    ],
+    13: [
+        [(0, 12), (1, 10), (2, 9), (3, 7), (5, 11), (6, 8)],
+        [(1, 6), (2, 3), (4, 11), (7, 9), (8, 10)],
+        [(0, 4), (1, 2), (3, 6), (7, 8), (9, 10), (11, 12)],
+        [(4, 6), (5, 9), (8, 11), (10, 12)],
+        [(0, 5), (3, 8), (4, 7), (6, 11), (9, 10)],
+        [(0, 1), (2, 5), (6, 9), (7, 8), (10, 11)],
+        [(1, 3), (2, 4), (5, 6), (9, 10)],
+        [(1, 2), (3, 4), (5, 7), (6, 8)],
+        [(2, 3), (4, 5), (6, 7), (8, 9)],
+        [(3, 4), (5, 6)],
+    ],
+    14: [
+        [(0, 1), (2, 3), (4, 5), (6, 7), (8, 9), (10, 11), (12, 13)],
+        [(0, 2), (1, 3), (4, 8), (5, 9), (10, 12), (11, 13)],
+        [(0, 4), (1, 2), (3, 7), (5, 8), (6, 10), (9, 13), (11, 12)],
+        [(0, 6), (1, 5), (3, 9), (4, 10), (7, 13), (8, 12)],
+        [(2, 10), (3, 11), (4, 6), (7, 9)],
+        [(1, 3), (2, 8), (5, 11), (6, 7), (10, 12)],
+        [(1, 4), (2, 6), (3, 5), (7, 11), (8, 10), (9, 12)],
+        [(2, 4), (3, 6), (5, 8), (7, 10), (9, 11)],
+        [(3, 4), (5, 6), (7, 8), (9, 10)],
+        [(6, 7)],
+    ],
+    15: [
+        [(0, 13), (1, 12), (3, 14), (4, 8), (5, 6), (7, 11), (9, 10)],
+        [(0, 5), (1, 7), (2, 9), (3, 4), (6, 13), (8, 14), (11, 12)],
+        [(0, 1), (2, 3), (4, 5), (6, 8), (7, 9), (10, 11), (12, 13)],
+        [(0, 2), (1, 3), (4, 10), (5, 11), (6, 7), (8, 9), (12, 14)],
+        [(1, 2), (3, 12), (4, 6), (5, 7), (8, 10), (9, 11), (13, 14)],
+        [(1, 4), (2, 6), (5, 8), (7, 10), (9, 13), (11, 14)],
+        [(2, 4), (3, 6), (9, 12), (11, 13)],
+        [(3, 5), (6, 8), (7, 9), (10, 12)],
+        [(3, 4), (5, 6), (7, 8), (9, 10), (11, 12)],
+        [(6, 7), (8, 9)],
+    ],
+    16: [
+        [(0, 13), (1, 12), (2, 15), (3, 14), (4, 8), (5, 6), (7, 11), (9, 10)],
+        [(0, 5), (1, 7), (2, 9), (3, 4), (6, 13), (8, 14), (10, 15), (11, 12)],
+        [(0, 1), (2, 3), (4, 5), (6, 8), (7, 9), (10, 11), (12, 13), (14, 15)],
+        [(0, 2), (1, 3), (4, 10), (5, 11), (6, 7), (8, 9), (12, 14), (13, 15)],
+        [(1, 2), (3, 12), (4, 6), (5, 7), (8, 10), (9, 11), (13, 14)],
+        [(1, 4), (2, 6), (5, 8), (7, 10), (9, 13), (11, 14)],
+        [(2, 4), (3, 6), (9, 12), (11, 13)],
+        [(3, 5), (6, 8), (7, 9), (10, 12)],
+        [(3, 4), (5, 6), (7, 8), (9, 10), (11, 12)],
+        [(6, 7), (8, 9)],
+    ],
+}
+
+
+class SmallSort:
+    """
+    Kernels for sorting short ranges array[start:end] in-place.
+    insertion takes up to n(n-1)/2 comparisons but few moves,
+    binary_insertion takes about log2(n!) comparisons,
+    network takes a fixed sequence of comparisons, the smallest possible
+    for up to 12 elements and the smallest known up to 16, and is not stable.
+    """
+
+    KERNELS = ("insertion", "binary_insertion", "network")
+    STABLE_KERNELS = ("insertion", "binary_insertion")
+    MAX_NETWORK_LENGTH = 16
+    NETWORKS: Dict[int, List[Comparator]] = {
+        length: (
+            [comparator for layer in _KNOWN_NETWORKS[length] for comparator in layer]
+            if length in _KNOWN_NETWORKS
+            else _odd_even_merge_network(length)
+        )
+        for length in range(2, MAX_NETWORK_LENGTH + 1)
+    }
+
+    @classmethod
+    def get(cls, kernel: str, stable: bool = False) -> Kernel:
+        if kernel not in cls.KERNELS:
+            raise UnknownKernelError(kernel)
+        if stable and kernel not in cls.STABLE_KERNELS:
+            raise UnstableKernelError(kernel)
+        return getattr(cls, kernel)
+
+    @staticmethod
+    def insertion(array: List[ValueType], start: int, end: int):
+        for current in range(start + 1, end):
+            value = array[current]
+            runner = current
+            while start < runner and value < array[runner - 1]:
+                array[runner] = array[runner - 1]
+                runner -= 1
+            array[runner] = value
+
+    @staticmethod
+    def binary_insertion(array: List[ValueType], start: int, end: int):
+        for current in range(start + 1, end):
+            value = array[current]
+            position = bisect_right(array, value, start, current)
+            if position < current:
+                array[position + 1 : current + 1] = array[position:current]
+                array[position] = value
+
+    @classmethod
+    def network(cls, array: List[ValueType], start: int, end: int):
+        """
+        Sorting networks for up to MAX_NETWORK_LENGTH elements,
+        binary insertion beyond that.
+        """
+        length = end - start
+        if length > cls.MAX_NETWORK_LENGTH:
+            cls.binary_insertion(array, start, end)
+            return
+
+        for i, j in cls.NETWORKS.get(length, ()):
+            a = array[start + i]
+            b = array[start + j]
+            if b < a:
+                array[start + i] = b
+                array[start + j] = a
@@ -0,0 +1,32 @@
+import heapq
+
+from typing import Any, Callable, Iterable, List, Optional
+
+ValueType = Any
+KeyFunction = Optional[Callable[[ValueType], Any]]
+
+
+def nsmallest(
+    iterable: Iterable[ValueType], k: int, key: KeyFunction = None
+) -> List[ValueType]:
+    """
+    Returns the k smallest elements of iterable in sorted order.
+    Consumes the iterable as a stream, keeping only a max-heap of the
+    k smallest elements seen so far, so memory is O(k) and time O(n log k).
+    Equal elements keep their order of appearance.
+    """
+    if k <= 0:
+        return []
+    return heapq.nsmallest(k, iterable, key=key)
+
+
+def nlargest(
+    iterable: Iterable[ValueType], k: int, key: KeyFunction = None
+) -> List[ValueType]:
+    """
+    Returns the k largest elements of iterable, largest first.
+    Like nsmallest, with a min-heap of the k largest elements seen so far.
+    """
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, iterable, key=key)
@@ -0,0 +1,108 @@
+import array as arraymodule
+
+from typing import Any, List, Sequence
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+NumericArray = Any
+
+
+class Vectorized:
+    """
+    Sorting and selection for homogeneous numeric buffers,
+    one-dimensional NumPy arrays and array.array, done by NumPy.
+    Only available when NumPy is installed.
+    """
+
+    @staticmethod
+    def supports(array: Any) -> bool:
+        if numpy is None:
+            return False
+        if isinstance(array, numpy.ndarray):
+            return array.ndim == 1 and array.dtype.kind in "iuf"
+        if isinstance(array, arraymodule.array):
+            return array.typecode not in "uw"
+        return False
+
+    @staticmethod
+    def like(array: Any, values: List[Any]) -> Any:
+        """
+        Returns values in a container of the same type as array
+        if that is an array.array or a NumPy array, otherwise values itself.
+        Needs no NumPy for array.array.
+        """
+        if isinstance(array, arraymodule.array):
+            return arraymodule.array(array.typecode, values)
+        if numpy is not None and isinstance(array, numpy.ndarray):
+            return numpy.array(values, dtype=array.dtype)
+        return values
+
+    @staticmethod
+    def copy(array: NumericArray) -> NumericArray:
+        if isinstance(array, arraymodule.array):
+            return arraymodule.array(array.typecode, array)
+        return array.copy()
+
+    @classmethod
+    def sort(cls, array: NumericArray, stable: bool = False, reverse: bool = False):
+        """
+        Sorts the array in-place.
+        Equal numbers are indistinguishable, so reverse needs no extra care
+        to stay stable.
+        """
+        view = cls._view(array)
+        view.sort(kind="stable" if stable else "quicksort")
+        if reverse:
+            view[:] = view[::-1].copy()
+
+    @classmethod
+    def partial_sort(cls, array: NumericArray, k: int):
+        """
+        Moves the k smallest elements, in sorted order, to array[:k].
+        """
+        if k == 0:
+            return
+        view = cls._view(array)
+        if k < len(view):
+            view.partition(k - 1)
+        view[:k].sort()
+
+    @classmethod
+    def select(cls, array: NumericArray, k: int) -> Any:
+        """
+        Returns the k-th order statistic.
+        Partitions the array in-place around it, like Quickselect.
+        """
+        cls._view(array).partition(k)
+        return array[k]
+
+    @classmethod
+    def select_many(cls, array: NumericArray, ks: Sequence[int]) -> List[Any]:
+        """
+        Returns the order statistics for all ranks in ks,
+        partitioning the array in-place around them.
+        """
+        if ks:
+            cls._view(array).partition(sorted(set(ks)))
+        return [array[k] for k in ks]
+
+    @classmethod
+    def argsort(cls, array: NumericArray, stable: bool, reverse: bool) -> List[int]:
+        kind = "stable" if stable else "quicksort"
+        view = cls._view(array)
+        if not reverse:
+            return numpy.argsort(view, kind=kind).tolist()
+
+        # sort the reversed values and reverse back, which keeps ties in order
+        order = numpy.argsort(view[::-1], kind=kind)[::-1]
+        return (len(view) - 1 - order).tolist()
+
+    @staticmethod
+    def _view(array: NumericArray) -> "numpy.ndarray":
+        # shares memory with array.array, so sorting the view sorts the array
+        if isinstance(array, arraymodule.array):
+            return numpy.asarray(memoryview(array))
+        return array
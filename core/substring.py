@@ -0,0 +1,241 @@
+import random
+import time
+
+from typing import Dict, Hashable, Iterator, Optional, Tuple
+
+from core.kmp import (
+    Matcher,
+    MatchKMP,
+    Pattern,
+    Text,
+    normalize_pattern,
+    normalize_text,
+)
+
+
+class MatchHorspool(Matcher):
+    """
+    Boyer-Moore-Horspool search, which compares the window from its end
+    and then shifts it by how far the window's last item is from the end
+    of the pattern. For long patterns over large alphabets most of the text
+    is never read.
+    On its own, a pattern like "aaaa" would take O(text * pattern) in a run
+    of "a", so once the comparisons exceed MAX_COMPARISONS_PER_ITEM per item
+    of the text passed, the rest of the text is searched with KMP instead,
+    which keeps the search linear.
+    """
+
+    MAX_COMPARISONS_PER_ITEM = 1
+
+    def __init__(self, pattern: Text):
+        pattern = normalize_pattern(pattern)
+        self._pattern = pattern
+        self._shift = self._build_shift(pattern)
+
+    def finditer(
+        self, text: Text, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        pattern = self._pattern
+        text = normalize_text(pattern, text)
+        start, end, _ = slice(start, end).indices(len(text))
+        pattern_length = len(pattern)
+        if pattern_length == 0:
+            yield from range(start, end + 1)
+            return
+
+        shift = self._shift
+        last = pattern_length - 1
+        last_item = pattern[last]
+        window_end = start + last
+        max_comparisons = self.MAX_COMPARISONS_PER_ITEM
+        comparisons = 0
+
+        while window_end < end:
+            item = text[window_end]
+            if item == last_item:
+                offset = window_end - last
+                index = last - 1
+                while index >= 0 and pattern[index] == text[offset + index]:
+                    index -= 1
+                if index < 0:
+                    yield offset
+                comparisons += last - index
+                if comparisons > max_comparisons * (window_end + 1 - start):
+                    yield from MatchKMP.compile(pattern).finditer(text, offset + 1, end)
+                    return
+            window_end += shift.get(item, pattern_length)
+
+    @staticmethod
+    def _build_shift(pattern: Pattern) -> Dict[Hashable, int]:
+        """
+        shift[item] is the distance from the last occurrence of item
+        in pattern[:-1] to the end of the pattern.
+        Items that do not occur there shift by the whole pattern length.
+        """
+        last = len(pattern) - 1
+        return {pattern[index]: last - index for index in range(last)}
+
+
+class MatchTwoWay(Matcher):
+    """
+    Crochemore-Perrin Two-Way search, which takes linear time
+    and only constant extra space.
+    The pattern is split at a critical factorization pattern[:split + 1]
+    and pattern[split + 1:]. The right part is compared first, left to right,
+    and the left part only once the right part matches.
+    The items of the pattern must be ordered, as they are in str and bytes.
+    """
+
+    def __init__(self, pattern: Text):
+        pattern = normalize_pattern(pattern)
+        self._pattern = pattern
+        self._split, self._period, self._periodic = self._factorize(pattern)
+
+    def finditer(
+        self, text: Text, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[int]:
+        pattern = self._pattern
+        text = normalize_text(pattern, text)
+        start, end, _ = slice(start, end).indices(len(text))
+        pattern_length = len(pattern)
+        if pattern_length == 0:
+            yield from range(start, end + 1)
+            return
+
+        split = self._split
+        period = self._period
+        last_offset = end - pattern_length
+        offset = start
+
+        if not self._periodic:
+            while offset <= last_offset:
+                index = split + 1
+                while index < pattern_length and pattern[index] == text[offset + index]:
+                    index += 1
+                if index < pattern_length:
+                    offset += index - split
+                    continue
+                index = split
+                while index >= 0 and pattern[index] == text[offset + index]:
+                    index -= 1
+                if index < 0:
+                    yield offset
+                offset += period
+            return
+
+        # pattern[:memory + 1] is known to match after a shift by the period
+        memory = -1
+        while offset <= last_offset:
+            index = (split if split > memory else memory) + 1
+            while index < pattern_length and pattern[index] == text[offset + index]:
+                index += 1
+            if index < pattern_length:
+                offset += index - split
+                memory = -1
+                continue
+            index = split
+            while index > memory and pattern[index] == text[offset + index]:
+                index -= 1
+            if index <= memory:
+                yield offset
+            offset += period
+            memory = pattern_length - period - 1
+
+    @classmethod
+    def _factorize(cls, pattern: Pattern) -> Tuple[int, int, bool]:
+        """
+        Returns (split, period, periodic).
+        If periodic, period is the period of the whole pattern,
+        otherwise a shift that is safe after the right part matched.
+        """
+        split, period = cls._maximal_suffix(pattern, reverse=False)
+        reverse_split, reverse_period = cls._maximal_suffix(pattern, reverse=True)
+        if reverse_split > split:
+            split, period = reverse_split, reverse_period
+
+        # pattern[:split + 1] is a suffix of pattern[:split + 1 + period]
+        if all(pattern[i] == pattern[i + period] for i in range(split + 1)):
+            return split, period, True
+        return split, max(split + 1, len(pattern) - split - 1) + 1, False
+
+    @staticmethod
+    def _maximal_suffix(pattern: Pattern, reverse: bool) -> Tuple[int, int]:
+        """
+        Returns (start - 1, period) for the lexicographically maximal suffix
+        pattern[start:], under the reversed order if reverse.
+        """
+        length = len(pattern)
+        suffix = -1
+        index = 0
+        step = period = 1
+        while index + step < length:
+            a = pattern[index + step]
+            b = pattern[suffix + step]
+            if (b < a) if reverse else (a < b):
+                index += step
+                step = 1
+                period = index - suffix
+            elif a == b:
+                if step != period:
+                    step += 1
+                else:
+                    index += period
+                    step = 1
+            else:
+                suffix = index
+                index = suffix + 1
+                step = period = 1
+        return suffix, period
+
+
+def compile_pattern(pattern: Text, constant_space: bool = False) -> Matcher:
+    """
+    Returns the matcher expected to search for pattern fastest.
+    Horspool, which reads only part of most texts and falls back to KMP
+    on texts where it would not.
+    With constant_space, Two-Way for str and bytes, which takes
+    linear time but needs no table, and in CPython is somewhat slower.
+    """
+    pattern = normalize_pattern(pattern)
+    if constant_space and isinstance(pattern, (str, bytes)):
+        return MatchTwoWay(pattern)
+    return MatchHorspool(pattern)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    rng = random.Random("substring benchmark")
+    words = (
+        "the of and to in is that it was for on are with as be at by this had "
+        "not but from or have an they which one you were her all she there"
+    ).split()
+    texts = {
+        "natural language": " ".join(rng.choice(words) for _ in range(100_000)),
+        "DNA": "".join(rng.choice("ACGT") for _ in range(400_000)),
+        "runs": "".join(rng.choice("ab") * rng.randrange(1, 1000) for _ in range(800)),
+        "periodic": "".join(
+            rng.choice("abc") if rng.random() < 0.001 else "ab" for _ in range(200_000)
+        ),
+    }
+    engines = [MatchKMP, MatchTwoWay, MatchHorspool]
+
+    for name, text in texts.items():
+        patterns = [
+            text[offset : offset + length]
+            for length in (2, 4, 8, 16, 64)
+            for offset in [rng.randrange(len(text) - length)]
+        ]
+        patterns += [text[-1] * 8, text[-1] * 64, text[-2:] * 4, text[-2:] * 32]
+        for pattern in patterns:
+            chosen = type(compile_pattern(pattern))
+            timings = []
+            for engine in engines:
+                matcher = engine(pattern)
+                start_time = time.perf_counter()
+                matcher.count(text)
+                timings.append(time.perf_counter() - start_time)
+            line = "  ".join(
+                f"{engine.__name__[5:]:>8}{'*' if engine is chosen else ' '}"
+                f"{seconds:.3f}s"
+                for engine, seconds in zip(engines, timings)
+            )
+            print(f"{name:>16} {pattern[:16]!r:>20} {line}")
@@ -0,0 +1,344 @@
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+from typing import List, Optional, Sequence, Tuple, Union
+
+from core.kmp import BYTES_LIKE, MismatchedTypesError
+
+IndexedText = Union[str, bytes]
+
+# magic, version, 1 if the text is a str, 1 if big-endian, text length
+HEADER = struct.Struct("<4sBBBxq")
+MAGIC = b"TIDX"
+VERSION = 1
+ITEM_SIZE = array("i").itemsize
+
+
+class TextIndexError(Exception):
+    pass
+
+
+class UnsupportedTextError(TextIndexError):
+    """
+    Raised when indexing something other than a str or a bytes-like object.
+    """
+
+    pass
+
+
+class IndexFormatError(TextIndexError):
+    """
+    Raised when loading a file that is not an index saved on this platform.
+    """
+
+    pass
+
+
+class _MappedText:
+    """
+    A text stored in a buffer, which decodes only the slices it is asked for.
+    str are stored as UTF-32, so that offsets in the buffer are
+    four times offsets in the text.
+    """
+
+    def __init__(self, buffer: memoryview, is_str: bool):
+        self._buffer = buffer
+        self._width = 4 if is_str else 1
+        self._is_str = is_str
+
+    def __len__(self) -> int:
+        return len(self._buffer) // self._width
+
+    def __getitem__(self, index: Union[int, slice]) -> IndexedText:
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(len(self))
+        else:
+            start, stop = index, index + 1
+        data = self._buffer[start * self._width : stop * self._width]
+        if self._is_str:
+            return str(data, "utf-32-le", "surrogatepass")
+        return bytes(data) if isinstance(index, slice) else data[0]
+
+
+class TextIndex:
+    """
+    A suffix array and LCP array for one text, answering substring queries
+    in O(pattern * log text) instead of the O(text) of a scan.
+
+    suffix_array lists the start of every suffix of the text in sorted order,
+    so the occurrences of a pattern are the contiguous range of suffixes
+    that start with it, found by binary search.
+    lcp[r] is the length of the longest common prefix of the suffixes
+    at suffix_array[r - 1] and suffix_array[r], and lcp[0] is 0.
+
+    Both are array('i'). An index can be saved to a file and loaded
+    from it by memory-mapping, without building it again.
+    """
+
+    def __init__(self, text: Union[str, bytes, bytearray, memoryview]):
+        if isinstance(text, BYTES_LIKE):
+            text = bytes(text)
+        elif not isinstance(text, str):
+            raise UnsupportedTextError(type(text).__name__)
+
+        self._text: Sequence = text
+        self._is_str = isinstance(text, str)
+        self._suffix_array: Sequence[int] = array("i", self._build_suffix_array(text))
+        self._lcp: Sequence[int] = array("i", self._build_lcp(text, self._suffix_array))
+        self._mapped: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+
+    @property
+    def suffix_array(self) -> Sequence[int]:
+        return self._suffix_array
+
+    @property
+    def lcp(self) -> Sequence[int]:
+        return self._lcp
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    def __contains__(self, pattern: IndexedText) -> bool:
+        return self.count(pattern) > 0
+
+    def count(self, pattern: IndexedText) -> int:
+        start, end = self._range(pattern)
+        # the empty pattern also occurs at the end, where no suffix starts
+        return end - start + (len(pattern) == 0)
+
+    def find(self, pattern: IndexedText) -> int:
+        """
+        Returns the offset of the first occurrence of pattern, or -1.
+        """
+        start, end = self._range(pattern)
+        if len(pattern) == 0:
+            return 0
+        if start == end:
+            return -1
+        return min(self._suffix_array[rank] for rank in range(start, end))
+
+    def positions(self, pattern: IndexedText) -> List[int]:
+        """
+        Returns the offsets of all occurrences of pattern, in increasing order.
+        """
+        start, end = self._range(pattern)
+        positions = sorted(self._suffix_array[rank] for rank in range(start, end))
+        if len(pattern) == 0:
+            positions.append(len(self))
+        return positions
+
+    def longest_repeat(self) -> IndexedText:
+        """
+        Returns the longest substring that occurs at least twice.
+        """
+        if not self._lcp:
+            return self._text[0:0]
+        rank = max(range(len(self._lcp)), key=self._lcp.__getitem__)
+        start = self._suffix_array[rank]
+        return self._text[start : start + self._lcp[rank]]
+
+    def _range(self, pattern: IndexedText) -> Tuple[int, int]:
+        """
+        Returns the range of ranks of the suffixes starting with pattern.
+        """
+        if isinstance(pattern, BYTES_LIKE):
+            pattern = bytes(pattern)
+        if isinstance(pattern, str) != self._is_str:
+            raise MismatchedTypesError
+
+        text = self._text
+        suffix_array = self._suffix_array
+        pattern_length = len(pattern)
+
+        low, high = 0, len(suffix_array)
+        while low < high:
+            middle = (low + high) // 2
+            suffix = suffix_array[middle]
+            if text[suffix : suffix + pattern_length] < pattern:
+                low = middle + 1
+            else:
+                high = middle
+        start = low
+
+        high = len(suffix_array)
+        while low < high:
+            middle = (low + high) // 2
+            suffix = suffix_array[middle]
+            if text[suffix : suffix + pattern_length] <= pattern:
+                low = middle + 1
+            else:
+                high = middle
+        return start, low
+
+    def save(self, path: Union[str, os.PathLike]):
+        """
+        Writes the text, suffix array and LCP array to path,
+        in native byte order.
+        """
+        if self._is_str:
+            encoded = self._text[:].encode("utf-32-le", "surrogatepass")
+        else:
+            encoded = bytes(self._text[:])
+        # keeps the arrays after the text aligned
+        padding = -len(encoded) % ITEM_SIZE
+
+        with open(path, "wb") as file:
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    self._is_str,
+                    sys.byteorder == "big",
+                    len(self._text),
+                )
+            )
+            file.write(encoded)
+            file.write(bytes(padding))
+            file.write(array("i", self._suffix_array).tobytes())
+            file.write(array("i", self._lcp).tobytes())
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "TextIndex":
+        """
+        Returns the index saved to path, memory-mapped rather than read,
+        so loading takes constant time and processes share the pages.
+        close() releases the mapping.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise IndexFormatError("too short")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return cls._from_mapped(mapped)
+        except Exception:
+            mapped.close()
+            raise
+
+    @classmethod
+    def _from_mapped(cls, mapped: mmap.mmap) -> "TextIndex":
+        magic, version, is_str, big_endian, length = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            raise IndexFormatError("not a text index")
+        if big_endian != (sys.byteorder == "big"):
+            raise IndexFormatError("saved with the other byte order")
+
+        text_size = length * 4 if is_str else length
+        text_start = HEADER.size
+        arrays_start = text_start + text_size + -text_size % ITEM_SIZE
+        arrays_size = 2 * length * ITEM_SIZE
+        if len(mapped) != arrays_start + arrays_size:
+            raise IndexFormatError("truncated")
+
+        buffer = memoryview(mapped)
+        text_buffer = buffer[text_start : text_start + text_size]
+        arrays = buffer[arrays_start:].cast("i")
+
+        index = cls.__new__(cls)
+        index._is_str = bool(is_str)
+        index._text = _MappedText(text_buffer, index._is_str)
+        index._suffix_array = arrays[:length]
+        index._lcp = arrays[length:]
+        index._mapped = mapped
+        # every view must be released before the mapping can be closed
+        index._views = [
+            index._lcp,
+            index._suffix_array,
+            arrays,
+            text_buffer,
+            buffer,
+        ]
+        return index
+
+    def close(self):
+        """
+        Releases the memory mapping of a loaded index,
+        after which it cannot be queried.
+        """
+        if self._mapped is None:
+            return
+        for view in self._views:
+            view.release()
+        self._mapped.close()
+        self._mapped = None
+
+    def __enter__(self) -> "TextIndex":
+        return self
+
+    def __exit__(self, err_type, err_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _build_suffix_array(text: IndexedText) -> List[int]:
+        """
+        Prefix doubling: after the round with width k, rank[i] orders the
+        suffixes by their first 2k items, as a pair of ranks by k items.
+        Each round sorts starting from the previous order, and at most
+        log2(len(text)) rounds are needed until all ranks differ.
+        """
+        length = len(text)
+        if length == 0:
+            return []
+
+        rank = [ord(item) for item in text] if isinstance(text, str) else list(text)
+        suffix_array = list(range(length))
+        width = 1
+        # ranks start out as the items themselves, not necessarily dense
+        distinct = max(rank) + 1
+
+        while True:
+            # 0 stands for past the end, which sorts first
+            base = distinct + 1
+            keys = [
+                rank[i] * base + (rank[i + width] + 1 if i + width < length else 0)
+                for i in range(length)
+            ]
+            suffix_array.sort(key=keys.__getitem__)
+
+            new_rank = [0] * length
+            current = 0
+            for position in range(1, length):
+                if keys[suffix_array[position]] != keys[suffix_array[position - 1]]:
+                    current += 1
+                new_rank[suffix_array[position]] = current
+            rank = new_rank
+            distinct = current + 1
+
+            if distinct == length:
+                return suffix_array
+            width *= 2
+
+    @staticmethod
+    def _build_lcp(text: Sequence, suffix_array: Sequence[int]) -> List[int]:
+        """
+        Kasai's algorithm, in O(text).
+        Visiting the suffixes in text order, the common prefix with the
+        preceding suffix in sorted order shrinks by at most one each step.
+        """
+        length = len(text)
+        rank = [0] * length
+        for position, suffix in enumerate(suffix_array):
+            rank[suffix] = position
+
+        lcp = [0] * length
+        common = 0
+        for suffix in range(length):
+            position = rank[suffix]
+            if position == 0:
+                common = 0
+                continue
+            previous = suffix_array[position - 1]
+            while (
+                suffix + common < length
+                and previous + common < length
+                and text[suffix + common] == text[previous + common]
+            ):
+                common += 1
+            lcp[position] = common
+            if common:
+                common -= 1
+        return lcp
@@ -0,0 +1,20 @@
+"""
+Reference implementations for the string search tests.
+"""
+
+
+def brute_force(pattern, text, start=0, end=None):
+    end = len(text) if end is None else end
+    return [
+        i
+        for i in range(start, end - len(pattern) + 1)
+        if text[i : i + len(pattern)] == pattern
+    ]
+
+
+def brute_force_many(patterns, text):
+    return sorted(
+        (pattern_id, offset)
+        for pattern_id, pattern in enumerate(patterns)
+        for offset in brute_force(pattern, text)
+    )
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from core.aho_corasick import AhoCorasick, EmptyPatternError
+
+from naive_search import brute_force_many
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_classic_example(compact):
+    patterns = ["he", "she", "his", "hers"]
+    automaton = AhoCorasick(patterns, compact=compact)
+
+    assert automaton.findall("ushers") == [(1, 1), (0, 2), (3, 2)]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_nested_and_duplicate_patterns(compact):
+    patterns = ["a", "aa", "aaa", "aa"]
+    automaton = AhoCorasick(patterns, compact=compact)
+
+    assert sorted(automaton.finditer("aaaa")) == brute_force_many(patterns, "aaaa")
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_random(compact):
+    random.seed("test aho corasick random")
+    for _ in range(100):
+        patterns = [
+            "".join(random.choice("abc") for _ in range(random.randint(1, 4)))
+            for _ in range(random.randint(1, 10))
+        ]
+        text = "".join(random.choice("abc") for _ in range(random.randint(0, 80)))
+        automaton = AhoCorasick(patterns, compact=compact)
+
+        assert sorted(automaton.finditer(text)) == brute_force_many(patterns, text)
+
+
+def test_matches_ordered_by_end():
+    automaton = AhoCorasick(["abcd", "bc", "c"])
+    ends = [
+        offset + len(automaton.patterns[pattern_id])
+        for pattern_id, offset in automaton.finditer("xabcdabc")
+    ]
+
+    assert ends == sorted(ends)
+
+
+def test_no_patterns():
+    automaton = AhoCorasick([])
+
+    assert len(automaton) == 0
+    assert automaton.findall("abc") == []
+
+
+def test_empty_pattern():
+    with pytest.raises(EmptyPatternError):
+        AhoCorasick(["abc", ""])
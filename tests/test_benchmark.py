@@ -0,0 +1,74 @@
+import pytest
+
+from core.sorting.benchmark import (
+    DISTRIBUTIONS,
+    find_regressions,
+    main,
+    median_of_three_killer,
+    run_benchmarks,
+)
+
+import json
+import random
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS)
+def test_distributions(distribution):
+    for length in [0, 1, 10, 101]:
+        data = DISTRIBUTIONS[distribution](length, random.Random("test"))
+        assert len(data) == length
+
+
+def test_median_of_three_killer_is_permutation():
+    for length in range(50):
+        assert sorted(median_of_three_killer(length)) == list(range(1, length + 1))
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(
+        sizes=[10, 20], distributions=["random", "sorted"], repeat=1
+    )
+
+    assert len(results) == 2 * 2 * 4
+    assert {r["algorithm"] for r in results} == {
+        "quicksort",
+        "mergesort",
+        "quickselect",
+        "builtin",
+    }
+    assert all(r["seconds"] >= 0 for r in results)
+
+
+def test_find_regressions():
+    baseline = [
+        {"algorithm": "quicksort", "distribution": "sorted", "size": 10, "seconds": 1},
+        {"algorithm": "mergesort", "distribution": "sorted", "size": 10, "seconds": 1},
+    ]
+    results = [
+        {"algorithm": "quicksort", "distribution": "sorted", "size": 10, "seconds": 3},
+        {"algorithm": "mergesort", "distribution": "sorted", "size": 10, "seconds": 1},
+        {"algorithm": "builtin", "distribution": "sorted", "size": 10, "seconds": 9},
+    ]
+
+    regressions = find_regressions(results, baseline, max_slowdown=1.5)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("quicksort on sorted of size 10")
+    assert find_regressions(results, baseline, 1.5, min_seconds=10) == []
+
+
+def test_main(tmp_path):
+    output = tmp_path / "results.json"
+    arguments = ["--sizes", "10", "--repeat", "1", "--algorithms", "quicksort"]
+
+    assert main(arguments + ["--output", str(output)]) == 0
+
+    results = json.loads(output.read_text())
+    assert len(results) == len(DISTRIBUTIONS)
+
+    for result in results:
+        result["seconds"] = -1.0
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results))
+    arguments += ["--baseline", str(baseline), "--min-seconds", "-2"]
+    assert main(arguments) == 1
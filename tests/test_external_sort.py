@@ -0,0 +1,92 @@
+import pytest
+
+from core.sorting.external import ExternalSort, ExternalSortError
+
+import random
+import tracemalloc
+
+
+class Record:
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+
+def test_external_sort_in_memory():
+    random.seed("test external sort in memory")
+    array = [random.randint(0, 100) for _ in range(100)]
+
+    assert list(ExternalSort.run(iter(array))) == sorted(array)
+
+
+def test_external_sort_empty():
+    assert list(ExternalSort.run([])) == []
+    assert list(ExternalSort.run([], memory_limit=1)) == []
+
+
+@pytest.mark.parametrize("fan_in", [2, 3, 16])
+def test_external_sort_spills(fan_in, tmp_path):
+    random.seed("test external sort spills")
+    array = [random.randint(0, 10**6) for _ in range(2000)]
+
+    result = ExternalSort.run(
+        iter(array), memory_limit=1000, fan_in=fan_in, directory=str(tmp_path)
+    )
+
+    assert list(result) == sorted(array)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_external_sort_key_stable(reverse):
+    random.seed("test external sort key")
+    records = [Record(random.randint(0, 10), tag) for tag in range(500)]
+
+    result = ExternalSort.run(
+        records, key=lambda r: r.key, reverse=reverse, memory_limit=2000, fan_in=2
+    )
+
+    expected = sorted(records, key=lambda r: r.key, reverse=reverse)
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+
+def test_external_sort_file(tmp_path):
+    random.seed("test external sort file")
+    lines = [f"{random.randint(0, 10**6):07d}" for _ in range(1000)]
+    source = tmp_path / "source.txt"
+    target = tmp_path / "target.txt"
+    source.write_text("\n".join(lines))
+
+    ExternalSort.run_file(str(source), str(target), memory_limit=4000, fan_in=4)
+
+    assert target.read_text().splitlines() == sorted(lines)
+
+
+def test_external_sort_invalid_options():
+    # raised when called, not when the result is first iterated
+    with pytest.raises(ExternalSortError):
+        ExternalSort.run([1], memory_limit=0)
+    with pytest.raises(ExternalSortError):
+        ExternalSort.run([1], fan_in=1)
+
+
+@pytest.mark.parametrize("key", [None, str])
+def test_external_sort_memory_limit(key, tmp_path):
+    random.seed("test external sort memory limit")
+    memory_limit = 1024 * 1024
+    values = (random.randint(0, 10**9) for _ in range(40_000))
+
+    tracemalloc.start()
+    try:
+        result = ExternalSort.run(
+            values, key=key, memory_limit=memory_limit, directory=str(tmp_path)
+        )
+        next(result)
+        _, peak = tracemalloc.get_traced_memory()
+        result.close()
+    finally:
+        tracemalloc.stop()
+
+    # sorting and spilling a chunk is governed by memory_limit,
+    # the rest is pickle buffers and interpreter bookkeeping
+    assert peak < 1.5 * memory_limit
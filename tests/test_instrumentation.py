@@ -0,0 +1,102 @@
+import pytest
+
+from core.sorting.instrumentation import SortStats
+from core.sorting.quicksort import Quicksort
+from core.sorting.quickselect import Quickselect
+from core.sorting.mergesort import Mergesort
+
+import random
+
+
+class Record:
+    comparisons = 0
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        Record.comparisons += 1
+        return self.key < other.key
+
+
+@pytest.mark.parametrize("strategy", Quicksort.STRATEGIES)
+def test_quicksort_stats(strategy):
+    random.seed("test quicksort stats")
+    array = [random.randint(0, 1000) for _ in range(2000)]
+    stats = SortStats()
+
+    Quicksort.run(array, strategy=strategy, stats=stats)
+
+    assert array == sorted(array)
+    assert stats.comparisons > 2000
+    assert stats.moves > 0
+    assert 0 < stats.max_depth <= 2 * len(array).bit_length()
+    assert stats.partitions == len(stats.imbalances)
+    assert all(0 < imbalance <= 1 for imbalance in stats.imbalances)
+    assert all(size < Quicksort.SMALL_SORT_CUTOFF for size in stats.leaf_sizes)
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_mergesort_stats_count_comparisons(adaptive):
+    random.seed("test mergesort stats")
+    keys = [random.random() for _ in range(1000)]
+
+    Record.comparisons = 0
+    Mergesort.run([Record(key) for key in keys], adaptive=adaptive)
+    expected = Record.comparisons
+
+    stats = SortStats()
+    result = Mergesort.run(
+        [Record(key) for key in keys], adaptive=adaptive, stats=stats
+    )
+
+    assert [r.key for r in result] == sorted(keys)
+    assert stats.comparisons == expected
+    assert stats.moves > 0
+    assert stats.leaf_sizes
+
+
+def test_mergesort_stats_key():
+    records = [Record(key) for key in [3, 1, 2]]
+    stats = SortStats()
+
+    result = Mergesort.run(records, key=lambda r: r.key, stats=stats)
+
+    assert [r.key for r in result] == [1, 2, 3]
+    assert stats.comparisons > 0
+
+
+def test_quickselect_stats_imbalance():
+    array = list(range(200))
+    stats = SortStats()
+
+    assert Quickselect.select(array, 199, pivot="first", stats=stats) == 199
+
+    assert stats.max_depth == stats.partitions
+    assert stats.as_dict()["mean_imbalance"] > 0.8
+
+
+def test_select_many_stats():
+    random.seed("test select many stats")
+    array = [random.random() for _ in range(1000)]
+    expected = sorted(array)
+    stats = SortStats()
+
+    result = Quickselect.select_many(array, [10, 500, 990], stats=stats)
+
+    assert result == [expected[10], expected[500], expected[990]]
+    assert stats.partitions > 0
+    assert stats.comparisons > 1000
+
+
+def test_stats_callback():
+    reported = []
+    stats = SortStats(callback=reported.append)
+
+    Quicksort.run([3, 2, 1], stats=stats)
+
+    assert reported == [stats]
+    summary = stats.as_dict()
+    assert summary["comparisons"] == stats.comparisons
+    assert summary["leaves"] == 1
+    assert summary["mean_leaf_size"] == 3
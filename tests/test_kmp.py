@@ -1,4 +1,26 @@
-from core.kmp import MatchKMP
+import array
+import io
+import mmap
+import random
+import threading
+
+import pytest
+
+from core.kmp import (
+    DEFAULT_CACHE_SIZE,
+    EmptyPatternError,
+    InvalidCacheSizeError,
+    LRUCache,
+    MatchDFA,
+    Matcher,
+    MatchKMP,
+    MismatchedTypesError,
+    StreamKMP,
+    iter_search_file,
+    search_file,
+)
+
+from naive_search import brute_force
 
 
 def test_fail_function():
@@ -62,3 +84,364 @@ def test_kmp_not_at_end():
     matcher = MatchKMP(pattern)
     found, index = matcher.match(text)
     assert found is False
+
+
+def test_matcher_is_abstract():
+    with pytest.raises(TypeError):
+        Matcher()
+
+
+def test_border():
+    assert MatchKMP("ABAB")._border == 2
+    assert MatchKMP("AAAA")._border == 3
+    assert MatchKMP("ABC")._border == 0
+    assert MatchKMP("A")._border == 0
+
+
+def test_finditer_overlapping():
+    matcher = MatchKMP("ABA")
+
+    assert list(matcher.finditer("ABABABA")) == [0, 2, 4]
+    assert list(MatchKMP("AA").finditer("AAAA")) == [0, 1, 2]
+
+
+def test_finditer_random():
+    random.seed("test finditer random")
+    for _ in range(200):
+        pattern = "".join(random.choice("ab") for _ in range(random.randint(1, 5)))
+        text = "".join(random.choice("ab") for _ in range(random.randint(0, 50)))
+
+        assert list(MatchKMP(pattern).finditer(text)) == brute_force(pattern, text)
+
+
+def test_finditer_bounds():
+    text = "ABABCABABAB"
+    matcher = MatchKMP("AB")
+
+    assert list(matcher.finditer(text, 1)) == [2, 5, 7, 9]
+    assert list(matcher.finditer(text, 0, 6)) == [0, 2]
+    assert list(matcher.finditer(text, 0, 5)) == [0, 2]
+    assert list(matcher.finditer(text, 0, -2)) == [0, 2, 5, 7]
+    assert list(matcher.finditer(text, 5, 3)) == []
+
+
+def test_find_and_count():
+    text = "ABABCABABAB"
+    matcher = MatchKMP("ABAB")
+
+    assert matcher.find(text) == 0
+    assert matcher.find(text, 1) == 5
+    assert matcher.find(text, 1, 8) == -1
+    assert matcher.count(text) == 3
+    assert matcher.count(text, 3) == 2
+
+
+def test_empty_pattern():
+    matcher = MatchKMP("")
+
+    assert matcher.match("ABC") == (True, 0)
+    assert list(matcher.finditer("AB")) == [0, 1, 2]
+    assert matcher.count("") == 1
+
+
+def test_stream_across_chunks():
+    matcher = StreamKMP("ABAB")
+
+    assert matcher.feed("AB") == []
+    assert matcher.feed("A") == []
+    assert matcher.feed("BAB") == [0, 2]
+    assert matcher.feed("") == []
+    assert matcher.feed("CABAB") == [7]
+    assert matcher.offset == 11
+
+
+def test_stream_random_chunks():
+    random.seed("test stream random chunks")
+    for _ in range(100):
+        pattern = "".join(random.choice("ab") for _ in range(random.randint(1, 4)))
+        text = "".join(random.choice("ab") for _ in range(random.randint(0, 60)))
+        matcher = StreamKMP(pattern)
+
+        found = []
+        position = 0
+        while position < len(text):
+            size = random.randint(1, 7)
+            found += matcher.feed(text[position : position + size])
+            position += size
+
+        assert found == brute_force(pattern, text)
+
+
+def test_stream_reset():
+    matcher = StreamKMP("AB")
+    matcher.feed("XA")
+    matcher.reset()
+
+    assert matcher.feed("BAB") == [1]
+
+
+def test_stream_empty_pattern():
+    with pytest.raises(EmptyPatternError):
+        StreamKMP("")
+
+
+def test_scan_file(tmp_path):
+    text = "needle in a haystack, another needle, needleneedle" * 50
+    expected = brute_force("needle", text)
+
+    assert list(StreamKMP.scan("needle", io.StringIO(text), chunk_size=7)) == expected
+
+    path = tmp_path / "haystack.txt"
+    path.write_text(text)
+    assert list(StreamKMP.scan("needle", path, chunk_size=5)) == expected
+    assert list(StreamKMP.scan("needle", str(path))) == expected
+
+
+def test_bytes_like():
+    text = b"ABABCABABAB"
+
+    for pattern in [b"BABA", bytearray(b"BABA"), memoryview(b"BABA")]:
+        matcher = MatchKMP(pattern)
+        assert matcher.match(text) == (True, 6)
+        assert list(matcher.finditer(bytearray(text))) == [6]
+        assert list(matcher.finditer(memoryview(text))) == [6]
+
+
+def test_memoryview_of_other_format():
+    numbers = array.array("H", [0x4241, 0x4241])
+    text = memoryview(numbers)
+
+    assert list(MatchKMP(b"BAB").finditer(text)) == [1]
+
+
+def test_mmap(tmp_path):
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"\x00needle\xff" * 1000)
+
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        matcher = MatchKMP(b"needle")
+        assert matcher.count(mapped) == 1000
+        assert matcher.find(mapped, 2) == 9
+
+
+def test_tokens():
+    tokens = [101, 7, 42, 7, 42, 7, 102]
+    matcher = MatchKMP([7, 42, 7])
+
+    assert list(matcher.finditer(tokens)) == [1, 3]
+    assert list(matcher.finditer(tuple(tokens))) == [1, 3]
+    assert MatchKMP(iter([42, 7])).count(tokens) == 2
+
+
+def test_mismatched_types():
+    with pytest.raises(MismatchedTypesError):
+        MatchKMP("AB").match(b"ABAB")
+
+    with pytest.raises(MismatchedTypesError):
+        MatchKMP(b"AB").match("ABAB")
+
+
+def test_stream_bytes(tmp_path):
+    matcher = StreamKMP(b"ABAB")
+
+    assert matcher.feed(b"ABA") == []
+    assert matcher.feed(memoryview(b"BAB")) == [0, 2]
+
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"\xffneedle\x00" * 100)
+    assert list(StreamKMP.scan(b"needle", path, chunk_size=5)) == list(range(1, 800, 8))
+
+
+def test_stream_mmap(tmp_path):
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"xxabcxxabcabc" * 1000)
+
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        matcher = StreamKMP(b"abc")
+        found = matcher.feed(mapped)
+
+    assert len(found) == 3000
+    assert found[:3] == [2, 7, 10]
+    assert matcher.offset == 13000
+
+
+def test_dfa_columns():
+    columns = MatchDFA("ABAC")._build_columns("ABAC")
+
+    assert list(columns["A"]) == [1, 1, 3, 1, 1]
+    assert list(columns["B"]) == [0, 2, 0, 2, 0]
+    assert list(columns["C"]) == [0, 0, 0, 4, 0]
+
+
+def test_dfa_table():
+    matcher = MatchDFA(b"AB")
+    radix = MatchDFA.RADIX
+
+    assert len(matcher._table) == 3 * radix
+    assert matcher._table[ord("A")] == radix
+    assert matcher._table[radix + ord("B")] == 2 * radix
+    assert matcher._table[2 * radix + ord("A")] == radix
+    assert MatchDFA("AB")._table is None
+
+
+def test_dfa_random():
+    random.seed("test dfa random")
+    for _ in range(200):
+        pattern = "".join(random.choice("ab") for _ in range(random.randint(1, 5)))
+        text = "".join(random.choice("ab") for _ in range(random.randint(0, 50)))
+        start = random.randint(0, 5)
+        end = random.randint(start, 55)
+        expected = brute_force(pattern, text, start, min(end, len(text)))
+
+        assert list(MatchDFA(pattern).finditer(text, start, end)) == expected
+        for encoded in [text.encode(), memoryview(text.encode()), list(text.encode())]:
+            matcher = MatchDFA(pattern.encode())
+            assert list(matcher.finditer(encoded, start, end)) == expected
+
+
+def test_dfa_mmap_and_tokens(tmp_path):
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"\x00needle\xff" * 1000)
+
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        assert MatchDFA(b"needle").count(mapped) == 1000
+
+    assert list(MatchDFA([7, 42, 7]).finditer([1, 7, 42, 7, 42, 7])) == [1, 3]
+    assert list(MatchDFA("").finditer("AB")) == [0, 1, 2]
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    created = []
+
+    def create(key):
+        created.append(key)
+        return key.upper()
+
+    assert cache.get("a", lambda: create("a")) == "A"
+    assert cache.get("b", lambda: create("b")) == "B"
+    assert cache.get("a", lambda: create("a")) == "A"
+    assert cache.get("c", lambda: create("c")) == "C"
+    assert cache.get("b", lambda: create("b")) == "B"
+
+    # b was least recently used when c was added
+    assert created == ["a", "b", "c", "b"]
+    assert cache.info() == (1, 4, 2, 2)
+
+    cache.resize(1)
+    assert cache.info().currsize == 1
+    cache.clear()
+    assert cache.info() == (0, 0, 1, 0)
+
+
+def test_lru_cache_invalid_size():
+    with pytest.raises(InvalidCacheSizeError):
+        LRUCache(maxsize=-1)
+
+    cache = LRUCache(maxsize=2)
+    cache.get("a", lambda: "A")
+    with pytest.raises(InvalidCacheSizeError):
+        cache.resize(-1)
+    assert cache.info() == (0, 1, 2, 1)
+
+    with pytest.raises(InvalidCacheSizeError):
+        MatchKMP.set_cache_size(-1)
+    assert MatchKMP.cache_info().maxsize == DEFAULT_CACHE_SIZE
+
+    # a cache of size 0 stores nothing
+    cache.resize(0)
+    assert cache.get("b", lambda: "B") == "B"
+    assert cache.info().currsize == 0
+
+
+def test_compile_shares_matchers():
+    MatchKMP.cache_clear()
+    matcher = MatchKMP.compile("ABAB")
+
+    assert MatchKMP.compile("ABAB") is matcher
+    assert MatchKMP.compile(bytearray(b"ABAB")) is MatchKMP.compile(b"ABAB")
+    assert MatchKMP.compile(b"ABAB") is not matcher
+    assert MatchKMP.compile([1, 2]) is MatchKMP.compile((1, 2))
+    assert matcher.count("ABABAB") == 2
+
+    info = MatchKMP.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (4, 3, 3)
+    MatchKMP.cache_clear()
+
+
+def test_compile_cache_size():
+    MatchKMP.cache_clear()
+    MatchKMP.set_cache_size(2)
+    try:
+        first = MatchKMP.compile("A")
+        MatchKMP.compile("B")
+        MatchKMP.compile("C")
+
+        assert MatchKMP.compile("A") is not first
+        assert MatchKMP.cache_info().currsize == 2
+    finally:
+        MatchKMP.set_cache_size(DEFAULT_CACHE_SIZE)
+        MatchKMP.cache_clear()
+
+
+def test_compile_threads():
+    MatchKMP.cache_clear()
+    patterns = [f"pattern{i % 10}" for i in range(1000)]
+    results = {}
+
+    def worker(name):
+        results[name] = [MatchKMP.compile(pattern) for pattern in patterns]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for matchers in results.values():
+        for pattern, matcher in zip(patterns, matchers):
+            assert matcher is MatchKMP.compile(pattern)
+    assert MatchKMP.cache_info().currsize == 10
+    MatchKMP.cache_clear()
+
+
+@pytest.mark.parametrize("engine", [MatchKMP, MatchDFA])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_search_file(tmp_path, engine, workers):
+    random.seed("test search file")
+    data = bytes(random.choice(b"ab") for _ in range(2000))
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(data)
+
+    for pattern in [b"a", b"abba", b"aabab"]:
+        expected = brute_force(pattern, data)
+        # chunk sizes that put occurrences across the boundaries
+        for chunk_size in [3, 97, 1024, 4096]:
+            found = search_file(
+                path, pattern, workers=workers, chunk_size=chunk_size, engine=engine
+            )
+            assert found == expected
+
+
+def test_iter_search_file(tmp_path):
+    path = tmp_path / "haystack.bin"
+    path.write_bytes(b"needle" * 10)
+
+    offsets = iter_search_file(str(path), bytearray(b"dleneed"), chunk_size=8)
+    assert list(offsets) == list(range(3, 52, 6))
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert search_file(empty, b"needle") == []
+
+    with pytest.raises(EmptyPatternError):
+        search_file(path, b"")
+
+    with pytest.raises(MismatchedTypesError):
+        search_file(path, "needle", workers=1)
@@ -0,0 +1,76 @@
+import pytest
+
+from core.sorting.permutation import (
+    argsort,
+    apply_permutation,
+    InvalidPermutationError,
+    LengthMismatchError,
+)
+
+import random
+
+
+class Record:
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+
+@pytest.mark.parametrize("stable", [True, False])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_argsort(stable, reverse):
+    random.seed("test argsort")
+    array = [random.randint(0, 20) for _ in range(500)]
+
+    order = argsort(array, stable=stable, reverse=reverse)
+
+    assert sorted(order) == list(range(500))
+    assert [array[i] for i in order] == sorted(array, reverse=reverse)
+    if stable:
+        expected = sorted(range(500), key=lambda i: array[i], reverse=reverse)
+        assert order == expected
+
+
+def test_argsort_key():
+    random.seed("test argsort key")
+    records = [Record(random.randint(0, 20), tag) for tag in range(300)]
+
+    order = argsort(records, key=lambda r: r.key)
+
+    assert order == sorted(range(300), key=lambda i: records[i].key)
+    assert [r.tag for r in records] == list(range(300))
+
+
+def test_argsort_empty():
+    assert argsort([]) == []
+
+
+def test_apply_permutation():
+    random.seed("test apply permutation")
+    keys = [random.randint(0, 100) for _ in range(500)]
+    names = [f"name {key}" for key in keys]
+    tags = list(range(500))
+
+    order = argsort(keys)
+    apply_permutation(order, keys, names, tags)
+
+    assert keys == sorted(keys)
+    assert names == [f"name {key}" for key in keys]
+    assert tags == order
+
+
+def test_apply_permutation_cycles():
+    array = ["a", "b", "c", "d", "e"]
+
+    apply_permutation([1, 2, 0, 4, 3], array)
+
+    assert array == ["b", "c", "a", "e", "d"]
+
+
+def test_apply_permutation_errors():
+    with pytest.raises(LengthMismatchError):
+        apply_permutation([0, 1], [1, 2, 3])
+    with pytest.raises(InvalidPermutationError):
+        apply_permutation([0, 0], [1, 2])
+    with pytest.raises(InvalidPermutationError):
+        apply_permutation([0, 2], [1, 2])
@@ -0,0 +1,99 @@
+import pytest
+
+from core.sorting.radixsort import RadixSort, UnsupportedKeyError
+
+import random
+
+
+class Record:
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+
+def test_radixsort_integers():
+    random.seed("test radixsort integers")
+    for bound in [1, 255, 256, 2**32, 2**64]:
+        array = [random.randint(0, bound) for _ in range(1000)]
+        expected = sorted(array)
+
+        RadixSort.run(array)
+
+        assert array == expected
+
+
+def test_radixsort_signed_integers():
+    random.seed("test radixsort signed integers")
+    array = [random.randint(-(2**40), 2**40) for _ in range(1000)]
+    expected = sorted(array)
+
+    RadixSort.run(array)
+
+    assert array == expected
+
+
+def test_radixsort_trivial():
+    for array in [[], [1], [5, 5, 5]]:
+        expected = sorted(array)
+        RadixSort.run(array)
+        assert array == expected
+
+
+def test_radixsort_bytes():
+    random.seed("test radixsort bytes")
+    array = [
+        bytes(random.randint(0, 3) for _ in range(random.randint(0, 6)))
+        for _ in range(2000)
+    ]
+    expected = sorted(array)
+
+    RadixSort.run(array)
+
+    assert array == expected
+
+
+def test_radixsort_str():
+    random.seed("test radixsort str")
+    alphabet = "abcABé中\U0001f600"
+    array = [
+        "".join(random.choice(alphabet) for _ in range(random.randint(0, 5)))
+        for _ in range(2000)
+    ]
+    expected = sorted(array)
+
+    RadixSort.run(array)
+
+    assert array == expected
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize(
+    "make_key", [lambda: random.randint(-5, 5), lambda: random.choice(["a", "ab", "b"])]
+)
+def test_radixsort_key_stable(reverse, make_key):
+    random.seed("test radixsort key")
+    records = [Record(make_key(), tag) for tag in range(1000)]
+
+    RadixSort.run(records, key=lambda r: r.key, reverse=reverse)
+
+    expected = sorted(records, key=lambda r: (r.key, r.tag))
+    if reverse:
+        expected = sorted(expected, key=lambda r: r.key, reverse=True)
+    assert [(r.key, r.tag) for r in records] == [(r.key, r.tag) for r in expected]
+
+
+def test_radixsort_unsupported_keys():
+    with pytest.raises(UnsupportedKeyError):
+        RadixSort.run([1.5, 2.5])
+    with pytest.raises(UnsupportedKeyError):
+        RadixSort.run([1, b"a"])
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_radixsort_unsupported_keys_leave_array(reverse):
+    array = [1, 2, "x"]
+
+    with pytest.raises(UnsupportedKeyError):
+        RadixSort.run(array, reverse=reverse)
+
+    assert array == [1, 2, "x"]
@@ -0,0 +1,79 @@
+import pytest
+
+from core.sorting.smallsort import SmallSort, UnknownKernelError, UnstableKernelError
+
+import itertools
+import random
+
+
+class Record:
+    comparisons = 0
+
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        Record.comparisons += 1
+        return self.key < other.key
+
+
+@pytest.mark.parametrize("kernel", SmallSort.KERNELS)
+def test_kernels(kernel):
+    random.seed("test kernels")
+    sort = SmallSort.get(kernel)
+    for length in range(40):
+        array = [random.randint(0, 10) for _ in range(length + 4)]
+        expected = array[:2] + sorted(array[2:-2]) + array[-2:]
+
+        sort(array, 2, length + 2)
+
+        assert array == expected
+
+
+@pytest.mark.parametrize("kernel", SmallSort.STABLE_KERNELS)
+def test_kernels_stable(kernel):
+    random.seed("test kernels stable")
+    records = [Record(random.randint(0, 3), tag) for tag in range(30)]
+
+    SmallSort.get(kernel, stable=True)(records, 0, len(records))
+
+    expected = sorted(records, key=lambda r: r.key)
+    assert [(r.key, r.tag) for r in records] == [(r.key, r.tag) for r in expected]
+
+
+def test_networks_sort_all_zero_one_inputs():
+    # by the zero-one principle, a network sorting all 0-1 inputs sorts any input
+    for length in range(2, SmallSort.MAX_NETWORK_LENGTH + 1):
+        for bits in itertools.product([0, 1], repeat=length):
+            array = list(bits)
+            SmallSort.network(array, 0, length)
+            assert array == sorted(bits)
+
+
+def test_network_sizes():
+    # optimal up to 12 inputs, the smallest known beyond
+    smallest = [1, 3, 5, 9, 12, 16, 19, 25, 29, 35, 39, 45, 51, 56, 60]
+    assert [len(SmallSort.NETWORKS[n]) for n in range(2, 17)] == smallest
+
+
+def test_fewer_comparisons_than_insertion():
+    random.seed("test fewer comparisons")
+    counts = {}
+    for kernel in SmallSort.KERNELS:
+        random.seed("test fewer comparisons")
+        Record.comparisons = 0
+        for _ in range(100):
+            records = [Record(random.random(), 0) for _ in range(16)]
+            SmallSort.get(kernel)(records, 0, 16)
+        counts[kernel] = Record.comparisons
+
+    assert counts["binary_insertion"] < counts["insertion"]
+    assert counts["network"] < counts["insertion"]
+
+
+def test_get_errors():
+    with pytest.raises(UnknownKernelError):
+        SmallSort.get("bubble")
+    with pytest.raises(UnstableKernelError):
+        SmallSort.get("network", stable=True)
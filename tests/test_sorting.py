@@ -1,10 +1,47 @@
 import pytest
 
-from core.sorting.quicksort import Quicksort
-from core.sorting.quickselect import Quickselect, OutOfBoundsError
+from core.sorting.quicksort import Quicksort, UnknownStrategyError
+from core.sorting.quickselect import (
+    Quickselect,
+    OutOfBoundsError,
+    UnknownPivotStrategyError,
+)
 from core.sorting.mergesort import Mergesort
+from core.sorting.topk import nsmallest, nlargest
+from core.sorting.smallsort import UnstableKernelError
 
+from typing import List, Optional
+import array
 import random
+import time
+
+
+class Record:
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class CountingRecord(Record):
+    comparisons = 0
+
+    def __lt__(self, other):
+        CountingRecord.comparisons += 1
+        return self.key < other.key
+
+
+class CountingKey:
+    calls = 0
+
+    def __init__(self, field):
+        self._field = field
+
+    def __call__(self, record):
+        CountingKey.calls += 1
+        return getattr(record, self._field)
 
 
 def test_quicksort():
@@ -24,6 +61,181 @@ def test_quicksort_empty():
     assert array == []
 
 
+@pytest.mark.parametrize("strategy", Quicksort.STRATEGIES)
+def test_quicksort_strategies(strategy):
+    random.seed("test quicksort strategies")
+    for length in [0, 1, 10, 11, 100, 1000]:
+        for bound in [1, 10, 10**6]:
+            array = [random.randint(0, bound) for _ in range(length)]
+            expected = sorted(array)
+
+            Quicksort.run(array, strategy=strategy)
+
+            assert array == expected
+
+    for array in [list(range(500)), list(range(500, 0, -1)), [7] * 500]:
+        expected = sorted(array)
+        Quicksort.run(array, strategy=strategy)
+        assert array == expected
+
+
+class CountingList(list):
+    writes = 0
+
+    def __setitem__(self, index, value):
+        CountingList.writes += 1
+        super().__setitem__(index, value)
+
+
+def count_quicksort(keys, strategy):
+    records = CountingList(CountingRecord(key, 0) for key in keys)
+    CountingRecord.comparisons = 0
+    CountingList.writes = 0
+
+    Quicksort.run(records, strategy=strategy)
+
+    assert [r.key for r in records] == sorted(keys)
+    return CountingRecord.comparisons, CountingList.writes
+
+
+def test_quicksort_strategy_counts():
+    random.seed("test quicksort strategy counts")
+    keys = [random.random() for _ in range(20000)]
+
+    comparisons, writes = count_quicksort(keys, "three_way")
+    for strategy in ["dual_pivot", "block"]:
+        strategy_comparisons, strategy_writes = count_quicksort(keys, strategy)
+        assert strategy_comparisons < comparisons
+        assert strategy_writes < writes
+
+
+def test_quicksort_unknown_strategy():
+    with pytest.raises(UnknownStrategyError):
+        Quicksort.run([1, 2], strategy="bogo")
+
+
+@pytest.mark.parametrize("small_sort", ["insertion", "binary_insertion", "network"])
+def test_quicksort_small_sort(small_sort):
+    random.seed("test quicksort small sort")
+    array = [random.randint(0, 100) for _ in range(1000)]
+    expected = sorted(array)
+
+    Quicksort.run(array, small_sort=small_sort)
+
+    assert array == expected
+
+
+def test_quicksort_median_of_three_comparisons():
+    random.seed("test quicksort median of three")
+    for _ in range(100):
+        records = [CountingRecord(random.random(), 0) for _ in range(3)]
+        CountingRecord.comparisons = 0
+
+        Quicksort._choose_pivot(records, 0, 3)
+
+        assert CountingRecord.comparisons <= 3
+
+
+def test_quicksort_heapsort():
+    random.seed("test quicksort heapsort")
+    for length in [0, 1, 2, 3, 10, 101]:
+        array = [random.randint(0, 100) for _ in range(length)]
+        expected = sorted(array)
+
+        Quicksort._heapsort(array, 0, length)
+
+        assert array == expected
+
+    array = [5, 4, 3, 2, 1, 0]
+    Quicksort._heapsort(array, 1, 5)
+    assert array == [5, 1, 2, 3, 4, 0]
+
+
+class FirstPivotQuicksort(Quicksort):
+    heapsorts = 0
+
+    @classmethod
+    def _choose_pivot(cls, array, start, end):
+        return array[start]
+
+    @classmethod
+    def _heapsort(cls, array, start, end):
+        cls.heapsorts += 1
+        super()._heapsort(array, start, end)
+
+
+def test_quicksort_falls_back_to_heapsort():
+    length = 5000
+    records = [CountingRecord(key, key) for key in range(length)]
+    CountingRecord.comparisons = 0
+
+    FirstPivotQuicksort.run(records)
+
+    assert [r.key for r in records] == list(range(length))
+    assert FirstPivotQuicksort.heapsorts > 0
+    assert CountingRecord.comparisons < 10 * length * length.bit_length()
+
+
+def test_quicksort_partial_sort():
+    random.seed("test quicksort partial sort")
+    for length in [0, 1, 9, 10, 100, 1000]:
+        for k in [0, 1, 5, 50, length, length + 1]:
+            array = [random.randint(0, 50) for _ in range(length)]
+            expected = sorted(array)
+
+            Quicksort.partial_sort(array, k)
+
+            assert array[:k] == expected[:k]
+            assert sorted(array) == expected
+
+
+def test_quicksort_partial_sort_key():
+    random.seed("test quicksort partial sort key")
+    records = [Record(random.randint(0, 1000), tag) for tag in range(1000)]
+    expected = sorted(r.key for r in records)
+
+    Quicksort.partial_sort(records, 100, key=lambda r: r.key)
+
+    assert [r.key for r in records[:100]] == expected[:100]
+
+
+def test_quicksort_partial_sort_comparisons():
+    random.seed("test quicksort partial sort comparisons")
+    keys = [random.random() for _ in range(10000)]
+
+    records = [CountingRecord(key, 0) for key in keys]
+    CountingRecord.comparisons = 0
+    Quicksort.partial_sort(records, 10)
+    partial = CountingRecord.comparisons
+
+    records = [CountingRecord(key, 0) for key in keys]
+    CountingRecord.comparisons = 0
+    Quicksort.run(records)
+    full = CountingRecord.comparisons
+
+    assert 3 * partial < full
+
+
+def test_nsmallest():
+    random.seed("test nsmallest")
+    array = [random.randint(0, 100) for _ in range(1000)]
+
+    assert nsmallest(iter(array), 10) == sorted(array)[:10]
+    assert nsmallest(array, 2000) == sorted(array)
+    assert nsmallest(array, 0) == []
+    assert nlargest(iter(array), 10) == sorted(array, reverse=True)[:10]
+
+
+def test_nsmallest_key_stable():
+    random.seed("test nsmallest key")
+    records = [Record(random.randint(0, 5), tag) for tag in range(100)]
+
+    result = nsmallest((r for r in records), 30, key=lambda r: r.key)
+
+    expected = sorted(records, key=lambda r: r.key)[:30]
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+
 def test_mergesort():
     random.seed("test mergesort")
     for _ in range(10):
@@ -41,6 +253,167 @@ def test_mergesort_empty():
     assert result == []
 
 
+def test_mergesort_does_not_mutate():
+    array = [3, 1, 2]
+    result = Mergesort.run(array)
+
+    assert result == [1, 2, 3]
+    assert array == [3, 1, 2]
+
+
+def test_mergesort_inplace():
+    random.seed("test mergesort inplace")
+    for length in [0, 1, 2, 3, 7, 8, 9, 100, 257]:
+        array = [random.randint(0, 100) for _ in range(length)]
+        expected = sorted(array)
+
+        Mergesort.sort_inplace(array)
+
+        assert array == expected
+
+
+def test_mergesort_stable():
+    random.seed("test mergesort stable")
+    records = [Record(random.randint(0, 10), tag) for tag in range(200)]
+
+    result = Mergesort.run(records)
+
+    assert [(r.key, r.tag) for r in result] == sorted((r.key, r.tag) for r in records)
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 31, 32, 33, 64, 1000, 5000])
+def test_mergesort_adaptive(length):
+    random.seed("test mergesort adaptive")
+    patterns = [
+        [random.randint(0, 100) for _ in range(length)],
+        [random.randint(0, 3) for _ in range(length)],
+        list(range(length // 2)) + list(range(length - length // 2)),
+        [(i * 7919) % 211 for i in range(length)],
+    ]
+    for array in patterns:
+        records = [Record(key, tag) for tag, key in enumerate(array)]
+
+        result = Mergesort.run(records, adaptive=True)
+
+        expected = sorted((r.key, r.tag) for r in records)
+        assert [(r.key, r.tag) for r in result] == expected
+
+
+@pytest.mark.parametrize("small_sort", ["insertion", "binary_insertion"])
+def test_mergesort_small_sort_stable(small_sort):
+    random.seed("test mergesort small sort")
+    records = [Record(random.randint(0, 10), tag) for tag in range(500)]
+
+    result = Mergesort.run(records, small_sort=small_sort)
+
+    expected = sorted(records, key=lambda r: r.key)
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+
+def test_mergesort_rejects_unstable_small_sort():
+    with pytest.raises(UnstableKernelError):
+        Mergesort.run([2, 1], small_sort="network")
+
+
+def test_mergesort_adaptive_presorted_comparisons():
+    length = 10000
+    for keys in [range(length), range(length, 0, -1), [0] * length]:
+        records = [CountingRecord(key, tag) for tag, key in enumerate(keys)]
+        CountingRecord.comparisons = 0
+
+        result = Mergesort.run(records, adaptive=True)
+
+        assert [r.key for r in result] == sorted(keys)
+        assert CountingRecord.comparisons < length
+
+
+def test_mergesort_adaptive_galloping_comparisons():
+    length = 10000
+    keys = list(range(0, length, 2)) + list(range(1, 100, 2))
+    records = [CountingRecord(key, tag) for tag, key in enumerate(keys)]
+    CountingRecord.comparisons = 0
+
+    result = Mergesort.run(records, adaptive=True)
+
+    assert [r.key for r in result] == sorted(keys)
+    assert CountingRecord.comparisons < 2 * len(keys)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_quicksort_key(reverse):
+    random.seed("test quicksort key")
+    records = [Record(random.randint(0, 20), tag) for tag in range(300)]
+    key = CountingKey("key")
+    CountingKey.calls = 0
+
+    Quicksort.run(records, key=key, reverse=reverse)
+
+    assert CountingKey.calls == 300
+    keys = [r.key for r in records]
+    assert keys == sorted(keys, reverse=reverse)
+
+
+def test_quicksort_reverse():
+    random.seed("test quicksort reverse")
+    array = [random.randint(0, 100) for _ in range(100)]
+
+    Quicksort.run(array, reverse=True)
+
+    assert array == sorted(array, reverse=True)
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_mergesort_key_stable(adaptive, reverse):
+    random.seed("test mergesort key")
+    records = [Record(random.randint(0, 20), tag) for tag in range(300)]
+    key = CountingKey("key")
+    CountingKey.calls = 0
+
+    result = Mergesort.run(records, key=key, reverse=reverse, adaptive=adaptive)
+
+    assert CountingKey.calls == 300
+    expected = sorted(records, key=lambda r: r.key, reverse=reverse)
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_mergesort_reverse_stable(adaptive):
+    random.seed("test mergesort reverse")
+    records = [Record(random.randint(0, 20), tag) for tag in range(300)]
+
+    result = Mergesort.run(records, reverse=True, adaptive=adaptive)
+
+    expected = sorted(records, key=lambda r: r.key, reverse=True)
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+
+class SmallParallelMergesort(Mergesort):
+    PARALLEL_THRESHOLD = 100
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_mergesort_parallel(reverse):
+    random.seed("test mergesort parallel")
+    records = [Record(random.randint(0, 20), tag) for tag in range(1000)]
+
+    result = SmallParallelMergesort.run(
+        records, key=lambda r: r.key, reverse=reverse, workers=3
+    )
+
+    expected = sorted(records, key=lambda r: r.key, reverse=reverse)
+    assert [(r.key, r.tag) for r in result] == [(r.key, r.tag) for r in expected]
+
+    array = [r.key for r in records]
+    result = SmallParallelMergesort.run(array, reverse=reverse, workers=4)
+    assert result == sorted(array, reverse=reverse)
+
+
+def test_mergesort_parallel_below_threshold():
+    array = [3, 1, 2]
+    assert Mergesort.run(array, workers=4) == [1, 2, 3]
+
+
 def test_quickselect():
     random.seed("test quickselect")
     for _ in range(10):
@@ -52,6 +425,139 @@ def test_quickselect():
         assert result == sorted(array)[k]
 
 
+@pytest.mark.parametrize("reverse", [False, True])
+def test_quickselect_key(reverse):
+    random.seed("test quickselect key")
+    for _ in range(10):
+        records = [Record(random.randint(0, 100), tag) for tag in range(100)]
+        tags = sorted(r.tag for r in records)
+        k = random.randint(0, 99)
+        key = CountingKey("key")
+        CountingKey.calls = 0
+
+        result = Quickselect.select(records, k, key=key, reverse=reverse)
+
+        assert CountingKey.calls == 100
+        assert result.key == sorted(r.key for r in records)[:: -1 if reverse else 1][k]
+        assert sorted(r.tag for r in records) == tags
+
+
+@pytest.mark.parametrize("pivot", Quickselect.PIVOT_STRATEGIES)
+def test_quickselect_pivot_strategies(pivot):
+    random.seed("test quickselect pivot strategies")
+    for length in [1, 2, 5, 6, 100, 2000]:
+        array = [random.randint(0, length) for _ in range(length)]
+        expected = sorted(array)
+        k = random.randrange(length)
+
+        result = Quickselect.select(array, k, pivot=pivot)
+
+        assert result == expected[k]
+        assert sorted(array) == expected
+
+
+@pytest.mark.parametrize("pivot", ["median_of_three", "median_of_medians"])
+def test_quickselect_sorted_input(pivot):
+    length = 20000
+    for keys in [range(length), range(length, 0, -1)]:
+        records = [CountingRecord(key, key) for key in keys]
+        CountingRecord.comparisons = 0
+
+        result = Quickselect.select(records, length // 2, pivot=pivot)
+
+        assert result.key == sorted(keys)[length // 2]
+        assert CountingRecord.comparisons < 30 * length
+
+
+def test_quickselect_is_iterative():
+    array = list(range(3000))
+
+    assert Quickselect.select(array, 2999, pivot="first") == 2999
+
+
+def test_quickselect_unknown_pivot():
+    with pytest.raises(UnknownPivotStrategyError):
+        Quickselect.select([1, 2, 3], 0, pivot="last")
+
+
+@pytest.mark.parametrize("pivot", Quickselect.PIVOT_STRATEGIES)
+def test_quickselect_select_many(pivot):
+    random.seed("test quickselect select many")
+    for length in [1, 10, 1000]:
+        array = [random.randint(0, 50) for _ in range(length)]
+        expected = sorted(array)
+        ks = [random.randrange(length) for _ in range(7)]
+
+        result = Quickselect.select_many(array, ks, pivot=pivot)
+
+        assert result == [expected[k] for k in ks]
+        assert sorted(array) == expected
+
+
+def test_quickselect_select_many_key_reverse():
+    random.seed("test quickselect select many key")
+    records = [Record(random.randint(0, 100), tag) for tag in range(500)]
+    expected = sorted(r.key for r in records)[::-1]
+
+    result = Quickselect.select_many(
+        records, [0, 250, 499], key=lambda r: r.key, reverse=True
+    )
+
+    assert [r.key for r in result] == [expected[0], expected[250], expected[499]]
+
+
+def test_quickselect_select_many_shares_partitions():
+    random.seed("test quickselect select many shares")
+    length = 20000
+    keys = [random.random() for _ in range(length)]
+    ks = [length // 2, length * 9 // 10, length * 99 // 100, length * 999 // 1000]
+
+    records = [CountingRecord(key, 0) for key in keys]
+    CountingRecord.comparisons = 0
+    Quickselect.select_many(records, ks)
+    batched = CountingRecord.comparisons
+
+    records = [CountingRecord(key, 0) for key in keys]
+    CountingRecord.comparisons = 0
+    for k in ks:
+        Quickselect.select(records[:], k)
+    separate = CountingRecord.comparisons
+
+    assert batched < separate
+
+
+def test_quickselect_select_many_empty():
+    assert Quickselect.select_many([1, 2], []) == []
+    with pytest.raises(OutOfBoundsError):
+        Quickselect.select_many([1, 2], [0, 2])
+
+
+def test_quickselect_quantiles():
+    array = list(range(1, 1001))
+    random.seed("test quickselect quantiles")
+    random.shuffle(array)
+
+    result = Quickselect.quantiles(array, [0, 0.5, 0.9, 0.99, 0.999, 1])
+
+    assert result == [1, 500, 900, 990, 999, 1000]
+    with pytest.raises(OutOfBoundsError):
+        Quickselect.quantiles(array, [1.5])
+    with pytest.raises(OutOfBoundsError):
+        Quickselect.quantiles([], [0.5])
+
+
+def test_array_module():
+    random.seed("test array module")
+    values = [random.randint(0, 100) for _ in range(100)]
+
+    buffer = array.array("l", values)
+    Quicksort.run(buffer)
+    assert list(buffer) == sorted(values)
+
+    assert list(Mergesort.run(array.array("l", values))) == sorted(values)
+    assert Quickselect.select(array.array("l", values), 50) == sorted(values)[50]
+
+
 def test_quickselect_empty():
     array = []
     with pytest.raises(OutOfBoundsError):
@@ -64,3 +570,20 @@ def test_quickselect_empty():
         Quickselect.select(array, -1)
     with pytest.raises(OutOfBoundsError):
         Quickselect.select(array, 3)
+
+
+def profile_mergesort(array: List[float], workers: Optional[int]) -> float:
+    # wall-clock time, process time would miss the work done by the pool
+    start = time.perf_counter()
+    Mergesort.run(array, workers=workers)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed("profile mergesort")
+    values = [random.random() for _ in range(2_000_000)]
+    serial = profile_mergesort(values, None)
+    print(f"Serial mergesort of {len(values)} items in {serial} seconds")
+    for workers in [2, 4, 8]:
+        runtime = profile_mergesort(values, workers)
+        print(f"{workers} workers in {runtime} seconds, speedup {serial / runtime:.2f}")
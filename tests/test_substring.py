@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from core.kmp import MatchKMP
+from core.substring import MatchHorspool, MatchTwoWay, compile_pattern
+
+from naive_search import brute_force
+
+ENGINES = [MatchKMP, MatchHorspool, MatchTwoWay]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_random(engine):
+    random.seed(f"test substring random {engine.__name__}")
+    for _ in range(300):
+        alphabet = random.choice(["a", "ab", "abc", "abcd"])
+        pattern = "".join(random.choice(alphabet) for _ in range(random.randint(1, 8)))
+        text = "".join(random.choice(alphabet) for _ in range(random.randint(0, 60)))
+        start = random.randint(0, 10)
+        end = random.randint(start, 70)
+
+        assert list(engine(pattern).finditer(text)) == brute_force(pattern, text)
+        assert list(engine(pattern).finditer(text, start, end)) == brute_force(
+            pattern, text, start, min(end, len(text))
+        )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_interface(engine):
+    matcher = engine("ABAB")
+    text = "ABABCABABAB"
+
+    assert matcher.pattern == "ABAB"
+    assert matcher.match(text) == (True, 0)
+    assert matcher.find(text, 1) == 5
+    assert matcher.count(text) == 3
+    assert engine("XY").match(text) == (False, -1)
+    assert list(engine("").finditer("AB")) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bytes(engine):
+    text = memoryview(b"\x00\x01\x00\x01\x00")
+
+    assert list(engine(b"\x00\x01\x00").finditer(text)) == [0, 2]
+
+
+@pytest.mark.parametrize("engine", [MatchKMP, MatchHorspool])
+def test_tokens(engine):
+    assert list(engine([3, 1, 3]).finditer([3, 1, 3, 1, 3, 2])) == [0, 2]
+
+
+def test_two_way_factorization():
+    # "ab" and "aab", and "abaab" has period 3
+    split, period, periodic = MatchTwoWay._factorize("abaab")
+    assert (split, period, periodic) == (1, 3, True)
+
+    assert MatchTwoWay._factorize("aaaa") == (-1, 1, True)
+
+
+class CountingText(str):
+    reads = 0
+
+    def __getitem__(self, index):
+        CountingText.reads += 1
+        return str.__getitem__(self, index)
+
+
+@pytest.mark.parametrize(
+    "pattern, text",
+    [
+        ("a" * 64, ("b" * 50 + "a" * 500) * 20),
+        ("ab" * 32, ("ab" * 300 + "c") * 20),
+        ("b" + "a" * 31, "a" * 10_000 + "ba" * 40),
+    ],
+    ids=["unary", "periodic", "periodic suffix"],
+)
+def test_horspool_falls_back_to_linear(pattern, text):
+    text = CountingText(text)
+    CountingText.reads = 0
+
+    found = list(MatchHorspool(pattern).finditer(text))
+
+    assert found == brute_force(pattern, str(text))
+    # without the fallback, about len(pattern) reads per item
+    assert CountingText.reads < 4 * len(text)
+    assert list(MatchHorspool(pattern).finditer(text, 7, -9)) == brute_force(
+        pattern, str(text), 7, len(text) - 9
+    )
+
+
+def test_compile_pattern():
+    assert isinstance(compile_pattern("needle"), MatchHorspool)
+    assert isinstance(compile_pattern("a"), MatchHorspool)
+    assert isinstance(compile_pattern(""), MatchHorspool)
+    assert isinstance(compile_pattern("ab" * 128), MatchHorspool)
+    assert isinstance(compile_pattern((7,) * 64), MatchHorspool)
+    assert isinstance(compile_pattern("needle", constant_space=True), MatchTwoWay)
+    assert isinstance(compile_pattern(b"needle", constant_space=True), MatchTwoWay)
+    assert isinstance(compile_pattern([1, 2], constant_space=True), MatchHorspool)
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from core.kmp import MismatchedTypesError
+from core.text_index import IndexFormatError, TextIndex, UnsupportedTextError
+
+from naive_search import brute_force
+
+
+def common_prefix(a, b):
+    length = 0
+    while length < min(len(a), len(b)) and a[length] == b[length]:
+        length += 1
+    return length
+
+
+def test_suffix_array_and_lcp():
+    index = TextIndex("banana")
+
+    assert list(index.suffix_array) == [5, 3, 1, 0, 4, 2]
+    assert list(index.lcp) == [0, 1, 3, 0, 0, 2]
+    assert index.longest_repeat() == "ana"
+
+
+def test_random_construction():
+    random.seed("test text index construction")
+    for _ in range(100):
+        text = "".join(random.choice("abc") for _ in range(random.randint(0, 60)))
+        index = TextIndex(text)
+        suffixes = sorted(range(len(text)), key=lambda i: text[i:])
+
+        assert list(index.suffix_array) == suffixes
+        lcp = [
+            common_prefix(text[a:], text[b:]) for a, b in zip(suffixes, suffixes[1:])
+        ]
+        assert list(index.lcp) == ([0] + lcp if text else [])
+
+
+def test_queries():
+    random.seed("test text index queries")
+    text = "".join(random.choice("ab") for _ in range(500))
+    index = TextIndex(text)
+
+    for _ in range(100):
+        pattern = "".join(random.choice("ab") for _ in range(random.randint(1, 8)))
+        expected = brute_force(pattern, text)
+
+        assert index.positions(pattern) == expected
+        assert index.count(pattern) == len(expected)
+        assert index.find(pattern) == (expected[0] if expected else -1)
+        assert (pattern in index) == bool(expected)
+
+
+def test_empty():
+    index = TextIndex("abc")
+
+    assert index.count("") == 4
+    assert index.positions("") == [0, 1, 2, 3]
+    assert index.find("") == 0
+    assert index.count("abcd") == 0
+    assert TextIndex("").count("a") == 0
+    assert TextIndex("").longest_repeat() == ""
+
+
+def test_bytes():
+    index = TextIndex(bytearray(b"abracadabra"))
+
+    assert index.positions(b"abra") == [0, 7]
+    assert index.positions(memoryview(b"a")) == [0, 3, 5, 7, 10]
+    assert index.longest_repeat() == b"abra"
+
+    with pytest.raises(MismatchedTypesError):
+        index.count("abra")
+
+
+def test_unsupported():
+    with pytest.raises(UnsupportedTextError):
+        TextIndex([1, 2, 3])
+
+
+@pytest.mark.parametrize(
+    "text", ["mississippi, naïve café ☕ mississippi", b"\x00\xff" * 50]
+)
+def test_save_load(tmp_path, text):
+    path = tmp_path / "index.bin"
+    TextIndex(text).save(path)
+
+    with TextIndex.load(path) as loaded:
+        built = TextIndex(text)
+        assert list(loaded.suffix_array) == list(built.suffix_array)
+        assert list(loaded.lcp) == list(built.lcp)
+        assert len(loaded) == len(text)
+        for pattern in [text[3:6], text[:1], text[-4:], text[:0]]:
+            assert loaded.positions(pattern) == brute_force(pattern, text)
+        assert loaded.longest_repeat() == built.longest_repeat()
+
+        # a loaded index can be saved again
+        loaded.save(tmp_path / "copy.bin")
+    assert (tmp_path / "copy.bin").read_bytes() == path.read_bytes()
+
+
+def test_load_invalid(tmp_path):
+    path = tmp_path / "index.bin"
+
+    path.write_bytes(b"TIDX")
+    with pytest.raises(IndexFormatError):
+        TextIndex.load(path)
+
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(IndexFormatError):
+        TextIndex.load(path)
+
+    TextIndex("banana").save(path)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(IndexFormatError):
+        TextIndex.load(path)
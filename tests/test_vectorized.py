@@ -0,0 +1,152 @@
+import pytest
+
+from core.sorting.quicksort import Quicksort
+from core.sorting.quickselect import Quickselect
+from core.sorting.mergesort import Mergesort
+from core.sorting.vectorized import Vectorized
+from core.sorting.permutation import argsort
+from core.sorting.instrumentation import SortStats
+
+import array
+import random
+
+numpy = pytest.importorskip("numpy")
+
+
+def test_supports():
+    assert Vectorized.supports(numpy.array([1, 2, 3]))
+    assert Vectorized.supports(numpy.array([1.0, 2.0]))
+    assert Vectorized.supports(array.array("q", [1, 2]))
+    assert not Vectorized.supports(numpy.array([[1, 2], [3, 4]]))
+    assert not Vectorized.supports(numpy.array(["a", "b"]))
+    assert not Vectorized.supports(array.array("u", "ab"))
+    assert not Vectorized.supports([1, 2, 3])
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_quicksort_numpy(reverse):
+    random.seed("test quicksort numpy")
+    values = [random.randint(-100, 100) for _ in range(1000)]
+    ndarray = numpy.array(values)
+    buffer = array.array("d", values)
+
+    Quicksort.run(ndarray, reverse=reverse)
+    Quicksort.run(buffer, reverse=reverse)
+
+    assert ndarray.tolist() == sorted(values, reverse=reverse)
+    assert buffer.tolist() == sorted(values, reverse=reverse)
+
+
+def test_mergesort_numpy_same_container():
+    random.seed("test mergesort numpy")
+    values = [random.random() for _ in range(1000)]
+    ndarray = numpy.array(values)
+    buffer = array.array("d", values)
+
+    sorted_ndarray = Mergesort.run(ndarray)
+    sorted_buffer = Mergesort.run(buffer)
+
+    assert isinstance(sorted_ndarray, numpy.ndarray)
+    assert isinstance(sorted_buffer, array.array)
+    assert sorted_ndarray.tolist() == sorted(values)
+    assert sorted_buffer.tolist() == sorted(values)
+    assert ndarray.tolist() == values
+    assert buffer.tolist() == values
+
+
+def test_quickselect_numpy():
+    random.seed("test quickselect numpy")
+    values = [random.randint(0, 100) for _ in range(1000)]
+    for k in [0, 499, 999]:
+        ndarray = numpy.array(values)
+        buffer = array.array("l", values)
+
+        assert Quickselect.select(ndarray, k) == sorted(values)[k]
+        assert Quickselect.select(buffer, k) == sorted(values)[k]
+        assert max(buffer[:k], default=-1) <= buffer[k] <= min(buffer[k:])
+
+
+def numeric_containers(values):
+    return [numpy.array(values), array.array("l", values), array.array("d", values)]
+
+
+def test_numpy_key_uses_python_path():
+    for container in numeric_containers([3, -1, 2]):
+        Quicksort.run(container, key=abs)
+        assert container.tolist() == [-1, 2, 3]
+
+    for container in numeric_containers([5, -3, 2]):
+        Quicksort.run(container, key=abs, reverse=True)
+        assert container.tolist() == [5, -3, 2]
+
+    for container in numeric_containers([5, -3, 2, -1]):
+        Quicksort.partial_sort(container, 2, key=abs)
+        assert container.tolist()[:2] == [-1, 2]
+
+    for container in numeric_containers([5, -3, 2, -1]):
+        assert Quickselect.select(container, 1, key=abs) == 2
+        assert sorted(container.tolist()) == [-3, -1, 2, 5]
+
+    for container in numeric_containers([5, -3, 2, -1]):
+        assert Quickselect.select_many(container, [0, 3], key=abs) == [-1, 5]
+
+    for container in numeric_containers([5, -3, 2]):
+        Mergesort.sort_inplace(container, key=abs)
+        assert container.tolist() == [2, -3, 5]
+
+
+def test_mergesort_key_same_container():
+    for container in numeric_containers([5, -3, 2]):
+        result = Mergesort.run(container, key=abs, reverse=True)
+
+        assert type(result) is type(container)
+        assert result.tolist() == [5, -3, 2]
+        assert container.tolist() == [5, -3, 2]
+
+    result = Mergesort.run(array.array("h", [3, 1, 2]), key=lambda value: -value)
+    assert result.typecode == "h"
+    assert result.tolist() == [3, 2, 1]
+
+    result = Mergesort.run(numpy.array([3, 1, 2], dtype=numpy.int8), stats=SortStats())
+    assert result.dtype == numpy.int8
+
+
+def test_numpy_reverse_with_stats():
+    for container in numeric_containers([3, -1, 2]):
+        Quicksort.run(container, reverse=True, stats=SortStats())
+        assert container.tolist() == [3, 2, -1]
+
+    ndarray = numpy.array([3, -1, 2])
+    Mergesort.sort_inplace(ndarray, reverse=True, stats=SortStats())
+    assert ndarray.tolist() == [3, 2, -1]
+
+
+def test_quickselect_select_many_numpy():
+    random.seed("test quickselect select many numpy")
+    values = [random.randint(0, 100) for _ in range(1000)]
+    ks = [999, 0, 500, 500]
+
+    result = Quickselect.select_many(numpy.array(values), ks)
+
+    assert result == [sorted(values)[k] for k in ks]
+
+
+def test_quicksort_partial_sort_numpy():
+    random.seed("test quicksort partial sort numpy")
+    values = [random.randint(0, 100) for _ in range(1000)]
+    for k in [0, 1, 10, 1000]:
+        ndarray = numpy.array(values)
+
+        Quicksort.partial_sort(ndarray, k)
+
+        assert ndarray[:k].tolist() == sorted(values)[:k]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_argsort_numpy(reverse):
+    random.seed("test argsort numpy")
+    values = [random.randint(0, 20) for _ in range(500)]
+
+    order = argsort(numpy.array(values, dtype="uint64"), reverse=reverse)
+
+    assert order == sorted(range(500), key=lambda i: values[i], reverse=reverse)